@@ -2,9 +2,10 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Action:
+class Action(Record):
     """
     Class for player actions.
     NECESSARY PREP-WORK:
@@ -12,6 +13,11 @@ class Action:
     quick, full, etc...)
     """
 
+    __slots__ = ("id", "name", "action_type", "description", "detail", "pilot", "reserve")
+    FIELDS = ["id", "name", "action_type", "description", "detail",
+              ("pilot", "obj.pilot", "obj.pilot"),
+              ("reserve", "obj.reserve", "obj.reserve")]
+
     START = ["DOWNTIME ACTIONS\n",
              "Downtime actions represent specific activities undertaken by",
              "Unlike skill checks, downtime actions have specific outcomes"]
@@ -74,18 +80,6 @@ class Action:
         self.id = gen_id(Action.PREFIX, self.name)
         self.detail = combine_lines(raw[1:])
 
-    def to_dict(self):
-        d = {"id": self.id,
-             "name": self.name,
-             "action_type": self.action_type,
-             "description": self.description,
-             "detail": self.detail}
-        if self.pilot:
-            d["pilot"] = self.pilot
-        if self.reserve:
-            d["reserve"] = self.reserve
-        return d
-
     def __eq__(self, other):
         if not isinstance(other, Action):
             return NotImplemented
@@ -2,13 +2,17 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Background:
+class Background(Record):
     """
     Class for pilot background.
     """
 
+    __slots__ = ("id", "name", "description", "triggers")
+    FIELDS = ["id", "name", "description", "triggers"]
+
     START = ["Celebrity\n",
              "Example triggers: Charm, Pull Rank,",
              "You were a figure in the public eye."]
@@ -57,9 +61,3 @@ class Background:
             line = line[:ital_start + 2] + "<i>" + line[ital_start + 2:] + "</i>"
             raw_desc.append(line)
         self.description = combine_lines(raw_desc)
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "description": self.description,
-                "triggers": self.triggers}
@@ -0,0 +1,187 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+"""
+Benchmarks each section of parser.py on synthetic rulebooks of increasing
+size. Books grow along two axes: the scale multiplies the number of entries,
+and the entry size multiplies the length of each entry's description and
+tag lines. Every section is parsed on its own for each scale and entry size,
+and its throughput is reported in lines/s and records/s. Throughput should
+stay roughly flat along both axes; a section whose throughput drops off has
+something quadratic in it, either across entries or within one, and is
+reported as a slowdown.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic import generate
+
+PARSER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser.py")
+
+# Phases which together make up a section's time.
+SECTION_PHASES = ["decode", "split", "classify", "parse", "serialize", "override", "write"]
+
+
+def section_flags():
+    """
+    @return: [str]: The names of parser.py's sections, in order.
+    """
+    # Load parser.py by path, since older Pythons have a built in "parser"
+    #   module which would be imported instead.
+    spec = importlib.util.spec_from_file_location("lancer_parser", PARSER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [sec[0] for sec in module.SECTIONS]
+
+
+def run_section(flag, book, work_dir, mask=None):
+    """
+    Parse one section of a book with parser.py.
+    @param flag: str: The section, as in parser.SECTIONS.
+    @param book: str: The raw text file.
+    @param work_dir: str: The directory to run in. Output goes to ../output/.
+    @param mask: str: The mask file to use, if any.
+    @return: (int, int, float): The number of lines in the section, the number
+    of records output, and the time taken in seconds.
+    """
+    timings = os.path.join(work_dir, "timings.json")
+    cmd = [sys.executable, PARSER, "--" + flag.replace("_", "-"), "--rebuild",
+           "--timings-json", timings]
+    if mask is not None:
+        cmd += ["-m", mask]
+    cmd.append(book)
+    subprocess.run(cmd, cwd=work_dir, check=True, stdout=subprocess.DEVNULL)
+
+    with open(timings, encoding='utf-8') as f:
+        phases = json.load(f)["sections"].get(flag, dict())
+    lines = phases.get("decode", dict()).get("records", 0)
+    records = phases.get("serialize", dict()).get("records", 0)
+    ns = sum(phases[p]["ns"] for p in SECTION_PHASES if p in phases)
+    return lines, records, ns / 1e9
+
+
+def benchmark(scales, repeat=1, mask=None, sections=None, entry_sizes=(1,)):
+    """
+    Run every section at each scale and entry size.
+    @param scales: [int]: The scale factors for the synthetic book.
+    @param repeat: int: How many times to run each section. The fastest run is
+    kept.
+    @param mask: str: The mask file to use, if any.
+    @param sections: [str]: The sections to run. Defaults to all of them.
+    @param entry_sizes: [int]: The entry sizes for the synthetic book.
+    @return: [dict]: One result per section per scale per entry size, with
+    "section", "scale", "entry_size", "lines", "records", "seconds",
+    "lines_per_s" and "records_per_s".
+    """
+    if sections is None:
+        sections = section_flags()
+    if mask is not None:
+        mask = os.path.abspath(mask)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = os.path.join(tmp, "work")
+        os.mkdir(work_dir)
+        os.mkdir(os.path.join(tmp, "output"))
+        for scale in scales:
+            for size in entry_sizes:
+                book = os.path.join(tmp, f"book{scale}x{size}.txt")
+                with open(book, 'w', encoding='utf-8') as f:
+                    f.writelines(generate(scale, size))
+                for flag in sections:
+                    runs = [run_section(flag, book, work_dir, mask) for _ in range(repeat)]
+                    lines, records, seconds = min(runs, key=lambda r: r[2])
+                    results.append(dict([
+                        ("section", flag),
+                        ("scale", scale),
+                        ("entry_size", size),
+                        ("lines", lines),
+                        ("records", records),
+                        ("seconds", seconds),
+                        ("lines_per_s", lines / seconds if seconds > 0 else 0.0),
+                        ("records_per_s", records / seconds if seconds > 0 else 0.0)
+                    ]))
+    return results
+
+
+def find_slowdowns(results, threshold):
+    """
+    Find sections whose throughput drops as the book grows, along either axis:
+    across scales at the same entry size, or across entry sizes at the same
+    scale.
+    @param results: [dict]: Results from benchmark().
+    @param threshold: float: The lowest acceptable ratio of a section's lines/s
+    at a larger scale or entry size to its lines/s at the smallest one.
+    @return: [(str, str, int, int, float)]: The section, the axis ("scale" or
+    "entry_size") it slows down along, the scale, the entry size and the ratio
+    of each slowdown.
+    """
+    slowdowns = []
+    for axis, other in [("scale", "entry_size"), ("entry_size", "scale")]:
+        base = dict()
+        for r in sorted(results, key=lambda r: r.get(axis, 1)):
+            group = (r["section"], r.get(other, 1))
+            if group not in base:
+                base[group] = r["lines_per_s"]
+            elif base[group] > 0:
+                ratio = r["lines_per_s"] / base[group]
+                if ratio < threshold:
+                    slowdowns.append((r["section"], axis, r["scale"],
+                                      r.get("entry_size", 1), ratio))
+    return slowdowns
+
+
+def print_results(results):
+    """
+    Print benchmark results as a table.
+    @param results: [dict]: Results from benchmark().
+    @return: None.
+    """
+    print(f"{'section':<12}{'scale':>7}{'entry':>7}{'lines':>10}{'records':>10}"
+          f"{'seconds':>10}{'lines/s':>12}{'records/s':>12}")
+    for r in sorted(results, key=lambda r: (r["section"], r["scale"], r["entry_size"])):
+        print(f"{r['section']:<12}{r['scale']:>6}x{r['entry_size']:>6}x{r['lines']:>10}"
+              f"{r['records']:>10}{r['seconds']:>10.4f}{r['lines_per_s']:>12.0f}"
+              f"{r['records_per_s']:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-x", "--scales", default="1,10,100",
+                        help="Comma separated scale factors for the synthetic book.")
+    parser.add_argument("-e", "--entry-sizes", default="1,10",
+                        help="Comma separated entry sizes for the synthetic book: multipliers "
+                             "for the length of each entry's description and tags.")
+    parser.add_argument("-n", "--repeat", type=int, default=1,
+                        help="Number of runs per section and scale; the fastest is kept.")
+    parser.add_argument("-m", "--mask", help="Mask file to parse with.")
+    parser.add_argument("--sections",
+                        help="Comma separated sections to run. Defaults to all of them.")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Report a slowdown when a section's lines/s at a larger scale "
+                             "or entry size falls below this fraction of its lines/s at the "
+                             "smallest one.")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to FILE.")
+    args = parser.parse_args()
+
+    scales = [int(x) for x in args.scales.split(",")]
+    sections = args.sections.split(",") if args.sections else None
+    entry_sizes = [int(x) for x in args.entry_sizes.split(",")]
+    results = benchmark(scales, args.repeat, args.mask, sections, entry_sizes)
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    slowdowns = find_slowdowns(results, args.threshold)
+    for section, axis, scale, size, ratio in slowdowns:
+        smallest = "scale" if axis == "scale" else "entry size"
+        print(f"Slowdown: {section} at {scale}x, entry size {size}x runs at {ratio:.0%} "
+              f"of its smallest {smallest}'s lines/s")
+    if len(slowdowns) > 0:
+        exit(1)
@@ -0,0 +1,107 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+import hashlib
+import json
+import os
+
+
+class BuildCache:
+    """
+    On-disk record of the inputs each section's output files were last built
+    from. A section's key is the SHA-256 of its raw text, the mask entries it
+    uses, and the parser source code. If the key hasn't changed since the
+    last build and the output files it wrote are still present, the section
+    doesn't need to be parsed or written again. Sections don't write outputs
+    they have nothing for, so only the files actually written are checked.
+    """
+
+    def __init__(self, file_name):
+        """
+        Load the cache file, if there is one.
+        @param file_name: str: The cache file.
+        """
+        self.file_name = file_name
+        # Maps section name -> {"key": key of the inputs it was last built from,
+        #   "files": [the output files it wrote]}.
+        self.keys = dict()
+        try:
+            with open(file_name, 'r', encoding='utf-8') as cache_file:
+                self.keys = json.load(cache_file)
+        except (FileNotFoundError, ValueError):
+            self.keys = dict()
+        if not isinstance(self.keys, dict):
+            self.keys = dict()
+
+    @staticmethod
+    def source_hash(directory):
+        """
+        Hash the parser source code, so that any change to the parsers
+        invalidates the cache.
+        @param directory: str: The directory containing the parser modules.
+        @return: str: Hex digest of all .py files in directory.
+        """
+        h = hashlib.sha256()
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".py"):
+                h.update(name.encode("utf-8"))
+                with open(os.path.join(directory, name), 'rb') as src:
+                    h.update(src.read())
+        return h.hexdigest()
+
+    @staticmethod
+    def section_key(raw, mask, code_hash, options=None):
+        """
+        Generate the cache key for a section.
+        @param raw: bytes: The raw text of the section.
+        @param mask: OverrideMask: The mask entries the section uses.
+        @param code_hash: str: The hash of the parser source code.
+        @param options: dict: Options the section is parsed with, if any.
+        @return: str: Hex digest identifying the section's inputs.
+        """
+        h = hashlib.sha256()
+        h.update(code_hash.encode("utf-8"))
+        h.update(json.dumps(list(mask), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        if options:
+            h.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+        h.update(raw)
+        return h.hexdigest()
+
+    def is_current(self, name, key, targets):
+        """
+        Check whether a section's outputs are up to date.
+        @param name: str: The section name.
+        @param key: str: The section's current key.
+        @param targets: [str]: The section's output files.
+        @return: bool: True if the section was last built from the same inputs
+        and every one of targets it wrote then still exists.
+        """
+        entry = self.keys.get(name)
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return False
+        written = set(entry.get("files", ()))
+        for target in targets:
+            if target in written and not os.path.exists(target):
+                return False
+        return True
+
+    def update(self, name, key, files=()):
+        """
+        Record that a section has been built.
+        @param name: str: The section name.
+        @param key: str: The key of the inputs it was built from.
+        @param files: [str]: The output files it wrote.
+        @return: None.
+        """
+        self.keys[name] = dict([("key", key), ("files", list(files))])
+
+    def save(self):
+        """
+        Write the cache file.
+        @return: None.
+        """
+        try:
+            with open(self.file_name, 'w', encoding='utf-8') as cache_file:
+                json.dump(self.keys, cache_file, indent=2, sort_keys=True)
+        except OSError as e:
+            print(f"Error ({e}) writing cache file {self.file_name}")
@@ -2,9 +2,10 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class CoreBonus:
+class CoreBonus(Record):
     """
     Class for core bonus data.
     NECESSARY PRE-WORK:
@@ -12,6 +13,9 @@ class CoreBonus:
     * Ensure the paragraph of core bonuses is preceded and followed by empty lines.
     """
 
+    __slots__ = ("id", "name", "source", "effect", "description")
+    FIELDS = ["id", "name", "source", "effect", "description"]
+
     PREFIX = "cb_"
 
     CORE = "CORE BONUSES\n"
@@ -49,12 +53,3 @@ class CoreBonus:
         self.id = gen_id(CoreBonus.PREFIX, self.name)
         self.description = combine_lines(text[1:-1])
         self.effect = text[-1].strip()
-
-    def to_dict(self):
-        return dict([
-            ("id", self.id),
-            ("name", self.name),
-            ("source", self.source),
-            ("effect", self.effect),
-            ("description", self.description)
-        ])
@@ -1,10 +1,25 @@
 #!/bin/python3
 # -*- utf-8 -*-
 
+import json
+import os
+import sys
+
+
+def output_name(target):
+    """
+    @param target: str: An output file, e.g. "../output/talents.json".
+    @return: str: The name of the output, the file's base name (e.g. "talents").
+    """
+    return os.path.splitext(os.path.basename(target))[0]
+
 
 class DataOutput:
     """Handles output to either file or console"""
 
+    # Matches json.dumps(data, indent=2, separators=(',', ': '), ensure_ascii=False)
+    ENCODER = json.JSONEncoder(indent=2, separators=(',', ': '), ensure_ascii=False)
+
     def __init__(self, target=None):
         self.target = target
 
@@ -14,14 +29,85 @@ class DataOutput:
         @param data: str: The data to write.
         @return: None.
         """
+        self.write_chunks([data])
+
+    def write_json(self, records):
+        """
+        Encode data as JSON and write it to self.target. The document is
+        streamed out as it is encoded rather than built up as one string.
+        @param records: [dict]: The data to write.
+        @return: int: The number of bytes written to file, or None if output
+        is to the console.
+        """
+        return self.write_chunks(DataOutput.ENCODER.iterencode(records))
+
+    def write_encoded(self, records):
+        """
+        Write records which are already encoded as JSON, as a list in the
+        same layout as write_json. Records are written as they come, so they
+        can be encoded on the fly.
+        @param records: iterable of str: The encoded records, each as an
+        element of the output list.
+        @return: int: The number of bytes written to file, or None if output
+        is to the console.
+        """
+        return self.write_chunks(DataOutput._list_chunks(records))
+
+    @staticmethod
+    def _list_chunks(records):
+        sep = "[\n  "
+        for r in records:
+            yield sep
+            yield r
+            sep = ",\n  "
+        yield "[]" if sep == "[\n  " else "\n]"
+
+    def write_chunks(self, chunks):
+        """
+        Write a sequence of strings to self.target through a buffered handle.
+        @param chunks: iterable of str: The data to write.
+        @return: int: The number of bytes written to file, or None if output
+        is to the console.
+        """
         if self.target is not None and self.target != "stdout":
             try:
                 with open(self.target, 'w', encoding='utf-8') as f:
-                    for line in data:
-                        f.write(line)
+                    f.writelines(chunks)
+                return os.path.getsize(self.target)
             except Exception as e:
                 print(f"Error ({e}) opening file {self.target}")
                 exit(1)
         else:
-            for line in data:
-                print(line)
+            sys.stdout.writelines(chunks)
+            sys.stdout.write("\n")
+
+
+class StdoutOutput(DataOutput):
+    """DataOutput which writes to the console whatever the target is."""
+
+    def __init__(self, target=None):
+        super().__init__("stdout")
+
+
+class RecordOutput:
+    """
+    Keeps output in memory rather than writing it, for using the parsers as a
+    library. Records are stored under the base name of their output file,
+    e.g. "../output/talents.json" -> "talents".
+    """
+
+    def __init__(self, records, target=None):
+        """
+        @param records: dict: Where to store the records.
+        @param target: str: The output file the records would be written to.
+        """
+        self.records = records
+        self.target = target
+
+    def write_json(self, records):
+        """
+        Store records.
+        @param records: [dict]: The data to store.
+        @return: None. Nothing is written.
+        """
+        self.records[output_name(self.target)] = records
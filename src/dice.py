@@ -0,0 +1,184 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+from fractions import Fraction
+from functools import lru_cache
+
+from parseutil import DIE_ROLL as DICE
+
+
+@lru_cache(maxsize=None)
+def load_numpy():
+    """
+    Import NumPy the first time it's needed, so that it's only loaded when
+    distributions or expected damage are worked out.
+    @return: module: NumPy, or None if it isn't installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class DiceExpr:
+    """
+    A damage roll such as "2d6+4", or a flat amount of damage. Each distinct
+    expression is parsed once and interned, so its distribution, mean and
+    variance are only worked out the first time they're needed. Distributions
+    are found by convolving the single die's distribution with NumPy if it is
+    installed, or in pure Python otherwise.
+    """
+
+    __slots__ = ("text", "count", "size", "bonus", "_counts")
+
+    # Maps expression text -> DiceExpr.
+    INTERNED = dict()
+
+    def __init__(self, text, count, size, bonus):
+        """
+        Use parse() or of() instead, to get the interned expression.
+        @param text: str: The expression as written.
+        @param count: int: The number of dice.
+        @param size: int: The number of sides on each die. 1 for flat damage.
+        @param bonus: int: The flat amount added to the roll.
+        """
+        self.text = text
+        self.count = count
+        self.size = size
+        self.bonus = bonus
+        self._counts = None
+
+    def __repr__(self):
+        return f"DiceExpr({self.text!r})"
+
+    def __str__(self):
+        return self.text
+
+    @staticmethod
+    def parse(text):
+        """
+        Parse a die roll.
+        @param text: str: The text to parse, e.g. "d6", "2d6" or "1d6+2".
+        @return: DiceExpr: The interned expression, or None if the text isn't
+        a die roll.
+        """
+        expr = DiceExpr.INTERNED.get(text)
+        if expr is None:
+            m = DICE.fullmatch(text)
+            if m is None:
+                return None
+            count, size, bonus = m.groups()
+            expr = DiceExpr(text, int(count or 1), int(size), int(bonus or 0))
+            DiceExpr.INTERNED[text] = expr
+        return expr
+
+    @staticmethod
+    def of(val):
+        """
+        Get the expression for a damage value as output in weapon data.
+        @param val: int or str: Flat damage, or a die roll.
+        @return: DiceExpr: The interned expression, or None if val is neither.
+        """
+        if isinstance(val, int):
+            expr = DiceExpr.INTERNED.get(val)
+            if expr is None:
+                expr = DiceExpr(str(val), 0, 1, val)
+                DiceExpr.INTERNED[val] = expr
+            return expr
+        elif isinstance(val, str):
+            return DiceExpr.parse(val)
+        return None
+
+    @property
+    def minimum(self):
+        return self.count + self.bonus
+
+    @property
+    def maximum(self):
+        return self.count * self.size + self.bonus
+
+    @property
+    def mean(self):
+        """
+        @return: Fraction: The exact mean of the roll.
+        """
+        return Fraction(self.count * (self.size + 1), 2) + self.bonus
+
+    @property
+    def variance(self):
+        """
+        @return: Fraction: The exact variance of the roll.
+        """
+        return Fraction(self.count * (self.size * self.size - 1), 12)
+
+    def counts(self):
+        """
+        Count the ways to roll each total.
+        @return: [int]: The number of ways to roll each total from minimum to
+        maximum, out of size ** count.
+        """
+        if self._counts is None:
+            numpy = load_numpy()
+            if numpy is not None and self.size ** self.count < 2 ** 63:
+                die = numpy.ones(self.size, dtype=numpy.int64)
+                counts = numpy.ones(1, dtype=numpy.int64)
+                for i in range(self.count):
+                    counts = numpy.convolve(counts, die)
+                self._counts = [int(c) for c in counts]
+            else:
+                counts = [1]
+                for i in range(self.count):
+                    rolled = [0] * (len(counts) + self.size - 1)
+                    for j in range(len(counts)):
+                        for k in range(self.size):
+                            rolled[j + k] += counts[j]
+                    counts = rolled
+                self._counts = counts
+        return self._counts
+
+    def distribution(self):
+        """
+        @return: dict: Maps each possible total -> Fraction: its exact
+        probability.
+        """
+        total = self.size ** self.count
+        return dict((self.minimum + i, Fraction(c, total))
+                    for i, c in enumerate(self.counts()))
+
+
+def mean_damage(damage_lists, exclude=("heat",)):
+    """
+    Work out the expected damage of many weapons at once. Each distinct damage
+    value is only parsed once across all of the weapons.
+    @param damage_lists: [[dict]]: The damage stats of each weapon, as output in
+    weapon data ({"type": ..., "val": ...}).
+    @param exclude: (str): Damage types not to count.
+    @return: [float]: The expected total damage of each weapon, or None for a
+    weapon with no countable damage.
+    """
+    exprs = dict()
+    for damage in damage_lists:
+        for d in damage:
+            val = d.get("val")
+            if d.get("type") not in exclude and val not in exprs:
+                exprs[val] = DiceExpr.of(val)
+    vals = [v for v in exprs if exprs[v] is not None]
+    numpy = load_numpy()
+    if numpy is not None and len(vals) > 0:
+        count = numpy.array([exprs[v].count for v in vals], dtype=numpy.float64)
+        size = numpy.array([exprs[v].size for v in vals], dtype=numpy.float64)
+        bonus = numpy.array([exprs[v].bonus for v in vals], dtype=numpy.float64)
+        means = dict(zip(vals, (count * (size + 1) / 2 + bonus).tolist()))
+    else:
+        means = dict((v, float(exprs[v].mean)) for v in vals)
+
+    result = []
+    for damage in damage_lists:
+        total = None
+        for d in damage:
+            val = d.get("val")
+            if d.get("type") not in exclude and val in means:
+                total = (total or 0.0) + means[val]
+        result.append(total)
+    return result
@@ -1,12 +1,16 @@
 #!/bin/python3
 # -*- utf-8 -*-
 
+from itertools import islice
+
 from parseutil import *
+from serializers import Record
 from licensegear import Weapon
+from licenseindex import LicenseIndex
 from manufacturer import Manufacturer
 
 
-class Frame:
+class Frame(Record):
     """
     Class for frame data.
     NECESSARY PREP-WORK:
@@ -25,6 +29,12 @@ class Frame:
         [3d6 explosive damage]
     """
 
+    __slots__ = ("id", "source", "name", "mechtype", "y_pos", "description", "mounts", "stats",
+                 "traits", "core_system", "data_type", "aptitude", "license", "license_index")
+    FIELDS = ["id", "source", "name", "mechtype", "y_pos", "description", "mounts", "stats", "traits",
+              ("core_system", "dict(obj.core_system, tags=obj.core_system[\"tags\"].to_list())"),
+              "data_type", "aptitude"]
+
     START = ["General Massive Systems\n",
              "From Cradle to the stars, GMS:\n",
              "assured quality, universal licensing,"]
@@ -42,6 +52,21 @@ class Frame:
     CORE_ACTIVE = "Active (1CP)"
     INTEGRATED = "Integrated Mount: "
 
+    # States of parse_text, in the order the subsections come in.
+    S_DESCRIPTION = 0
+    S_STATS = 1
+    S_TRAITS = 2
+    S_MOUNTS = 3
+    S_CORE = 4
+    S_LICENSE = 5
+    # Maps subsection header -> the state it starts.
+    HEADERS = dict([
+        (CORE_STATS, S_STATS),
+        (TRAITS, S_TRAITS),
+        (MOUNTS, S_MOUNTS),
+        (CORE, S_CORE)
+    ])
+
     STATS = dict([
         ("size", "size"),
         ("armor", "armor"),
@@ -91,12 +116,15 @@ class Frame:
             ("description", ""),
             ("active_name", ""),
             ("active_effect", ""),
-            ("tags", [])
+            ("tags", TagSet())
         ])
         self.data_type = "frame"
         self.aptitude = dict()
         # 2D list for what belongs in which level of the frame's license.
         self.license = [[] for i in range(3)]
+        # Index of self.license for setting the license level of gear. None if
+        #   the frame has no licensed gear.
+        self.license_index = None
 
         if raw_text is not None:
             # print(f"Frame from hunk:\n{raw_text}")
@@ -127,7 +155,8 @@ class Frame:
 
     def parse_text(self, raw_text):
         """
-        Parse the raw text for a mech frame.
+        Parse the raw text for a mech frame. The text is read in one pass,
+        with each subsection header moving on to the next state.
         @param raw_text: [str]: The raw text to parse.
         @return: None.
         """
@@ -136,146 +165,139 @@ class Frame:
         # Generate the id from the name
         self.id = gen_id(Frame.PREFIX, self.name)
 
-        # Raw text indices for subsections
-        desc = lic = stats = traits = mounts = core = 0
-
         # If the line after the name is only one word, it's the role
         if len(raw_text[2].split(" ")) == 1:
             desc = 3
+            for t in raw_text[2].split("/"):
+                self.mechtype.append(t.strip())
         else:
+            # If no role was found, its role is "Balanced"
             desc = 2
-        # Find the start of each subsection.
-        for i in range(len(raw_text)):
-            if lic == 0 and raw_text[i].startswith(Frame.LICENSE[0]):
-                lic = i
-            elif stats == 0 and raw_text[i] == Frame.CORE_STATS:
-                stats = i
-            elif traits == 0 and raw_text[i] == Frame.TRAITS:
-                traits = i
-            # elif sp == 0 and raw_text[i].startswith(Frame.SP):
-            #     sp = i
-            elif mounts == 0 and raw_text[i] == Frame.MOUNTS:
-                mounts = i
-            elif core == 0 and raw_text[i] == Frame.CORE:
-                core = i
-        # If no licensed gear was found, get rid of the 2nd dimension.
-        if lic == 0:
-            self.license = []
-
-        # If no role was found, its role is "Balanced"
-        if desc == 2:
             self.mechtype.append("Balanced")
-        else:
-            for t in raw_text[2].split("/"):
-                self.mechtype.append(t.strip())
 
-        # Description starts after the role and goes to CORE_STATS.
-        self.description = combine_lines(raw_text[desc:stats], check_horus=self.source == "HORUS")
+        state = Frame.S_DESCRIPTION
+        # Raw text indices of the end of the description, and the start of the
+        #   core system lines.
+        desc_end = core = None
+        # Raw text indices of the last core system "Active (1CP)", "---" and
+        #   integrated mount lines.
+        act = passive = integrated = None
+        trait_name = None
+        for i, line in enumerate(islice(raw_text, desc, None), desc):
+            if state < Frame.S_LICENSE and line.startswith(Frame.LICENSE[0]):
+                if state == Frame.S_CORE:
+                    self.parse_core(raw_text, core, i, act, passive, integrated)
+                state = Frame.S_LICENSE
+            elif line in Frame.HEADERS and state < Frame.HEADERS[line]:
+                if state == Frame.S_DESCRIPTION:
+                    desc_end = i
+                state = Frame.HEADERS[line]
+                if state == Frame.S_CORE:
+                    core = i + 1
+                continue
 
-        # Stats go until traits
-        for stat in raw_text[stats+1:traits]:
-            tokens = stat.split(":")
-            key = Frame.STATS[tokens[0].strip().lower()]
-            val = tokens[1].strip()
-            if val == "1/2":
-                self.stats[key] = 0.5
-            else:
-                self.stats[key] = int(val)
+            if state == Frame.S_DESCRIPTION:
+                continue
+            elif state == Frame.S_STATS:
+                tokens = line.split(":")
+                key = Frame.STATS[tokens[0].strip().lower()]
+                val = tokens[1].strip()
+                if val == "1/2":
+                    self.stats[key] = 0.5
+                else:
+                    self.stats[key] = int(val)
+            elif state == Frame.S_TRAITS:
+                # Traits alternate between a name line and a description line.
+                if trait_name is None:
+                    trait_name = line.strip()
+                else:
+                    self.traits.append(dict([
+                        ("name", trait_name),
+                        ("description", line.strip())
+                    ]))
+                    trait_name = None
+            elif state == Frame.S_MOUNTS:
+                mount = line.strip().replace("- ", "")
+                end = mount.lower().find(" mount")
+                if end != -1:
+                    mount = mount[:end]
+                mount = mount.title()
+                self.mounts.append("Flex" if mount == "Flexible" else mount)
+            elif state == Frame.S_CORE:
+                if line.startswith(Frame.CORE_ACTIVE):
+                    act = i
+                if line == "---\n":
+                    passive = i
+                if line.startswith(Frame.INTEGRATED):
+                    integrated = i
+            # Sort licensed gear by license level
+            elif line.startswith(Frame.LICENSE[1]):
+                self.license[0] = Frame.license_gear(line, Frame.LICENSE[1])
+            elif line.startswith(Frame.LICENSE[2]):
+                self.license[1] = Frame.license_gear(line, Frame.LICENSE[2])
+            elif line.startswith(Frame.LICENSE[3]):
+                self.license[2] = Frame.license_gear(line, Frame.LICENSE[3])
 
-        # Traits go until Mounts
-        traits_lines = raw_text[traits+1:mounts]
-        i = 0
-        while i < len(traits_lines):
-            # Each trait is a dict with two keys: name and description.
-            curr_trait = dict([
-                ("name", ""),
-                ("description", "")
-            ])
-            curr_trait["name"] = traits_lines[i].strip()
-            curr_trait["description"] = traits_lines[i+1].strip()
-            self.traits.append(curr_trait)
-            i += 2
+        # Description starts after the role and goes to CORE_STATS.
+        self.description = combine_lines(islice(raw_text, desc, desc_end), check_horus=self.source == "HORUS")
+        if state == Frame.S_CORE:
+            self.parse_core(raw_text, core, len(raw_text), act, passive, integrated)
+        if state == Frame.S_LICENSE:
+            self.license_index = LicenseIndex(self.license)
+        else:
+            # If no licensed gear was found, get rid of the 2nd dimension.
+            self.license = []
 
-        # Mounts go until core system
-        for mount in raw_text[mounts+1:core]:
-            mount = mount.strip().replace("- ", "")
-            end = mount.lower().find(" mount")
-            if end != -1:
-                self.mounts.append(mount[:end].title())
-            else:
-                self.mounts.append(mount.title())
-        for i in range(len(self.mounts)):
-            if self.mounts[i] == "Flexible":
-                self.mounts[i] = "Flex"
+    @staticmethod
+    def license_gear(line, rank):
+        """
+        @param line: str: A line of the license table.
+        @param rank: str: The rank identifier the line starts with.
+        @return: [str]: The lower case names of the gear at that rank.
+        """
+        return [t.strip().lower() for t in line[len(rank):].split(",")]
 
-        # Core system goes until the end
-        # Find all of the lines that are all caps - these are the passive
-        #   and active names.
-        if lic != 0:
-            core_lines = raw_text[core+1:lic]
-        else:
-            core_lines = raw_text[core+1:]
-        act_start = -1
-        pass_start = -1
-        integrated_start = -1
-        # Find the section for the CORE active.
-        for i in range(len(core_lines)):
-            if core_lines[i].startswith(Frame.CORE_ACTIVE):
-                act_start = i-1
-            if core_lines[i] == "---\n":
-                pass_start = i+1
-            if core_lines[i].startswith(Frame.INTEGRATED):
-                integrated_start = i
-        act_sec = core_lines[act_start:]
-        if pass_start != -1:
-            pass_sec = core_lines[pass_start:act_start]
-        else:
-            pass_sec = []
+    def parse_core(self, raw_text, start, end, act, passive, integrated):
+        """
+        Parse the core system, from the lines found while reading the frame.
+        @param raw_text: [str]: The raw text of the frame.
+        @param start: int: Index of the core system's first line, its name.
+        @param end: int: Index after the core system's last line.
+        @param act: int: Index of the "Active (1CP)" line, which follows the
+        active name.
+        @param passive: int: Index of the "---" line before the passive name,
+        or None if there is no passive.
+        @param integrated: int: Index of the integrated mount line, or None if
+        there is no integrated mount.
+        @return: None.
+        """
+        act_name = act - 1
         # First line is always the name of the core system
-        self.core_system["name"] = core_lines[0].strip()
+        self.core_system["name"] = raw_text[start].strip()
         # If the next line isn't a passive/active effect name, then the core
         #   system has a description.
-        if pass_start != 1 and act_start != 1:
-            if pass_start != -1:
-                desc_sec = core_lines[1:pass_start-1]
-            elif integrated_start != -1:
-                desc_sec = core_lines[1:integrated_start]
+        if passive != start and act_name != start + 1:
+            if passive is not None:
+                desc_end = passive
+            elif integrated is not None:
+                desc_end = integrated
             else:
-                desc_sec = core_lines[1:act_start]
-            self.core_system["description"] = combine_lines(desc_sec)
+                desc_end = act_name
+            self.core_system["description"] = combine_lines(islice(raw_text, start + 1, desc_end))
         # If the core system has a passive effect, parse it.
-        if pass_start != -1:
-            self.core_system["passive_name"] = pass_sec[0].strip()
-            self.core_system["passive_effect"] = ""
-            self.core_system["passive_effect"] = combine_lines(pass_sec[1:])
+        if passive is not None:
+            self.core_system["passive_name"] = raw_text[passive + 1].strip()
+            self.core_system["passive_effect"] = combine_lines(islice(raw_text, passive + 2, act_name))
         # If the core system has an integrated mount, add it.
-        if integrated_start != -1:
+        if integrated is not None:
             int_mech_name = gen_id(Weapon.PREFIX, self.name) + "_integrated"
             self.core_system["integrated"] = {"id": int_mech_name}
         # Parse the active name and effect
-        self.core_system["active_name"] = act_sec[0].strip()
+        self.core_system["active_name"] = raw_text[act_name].strip()
         # Line after the active name is the tags for the active effect
-        self.parse_tags(act_sec[1].strip())
+        self.parse_tags(raw_text[act].strip())
         # Lines after the tags is the active effect
-        self.core_system["active_effect"] = combine_lines(act_sec[2:])
-
-        # Sort licensed gear by license level
-        for line in raw_text[lic:]:
-            if line.startswith(Frame.LICENSE[1]):
-                # Remove the rank identifier from the start of the line
-                line = line[len(Frame.LICENSE[1]):]
-                license_gear = [t.strip().lower() for t in line.split(",")]
-                self.license[0] = license_gear
-            elif line.startswith(Frame.LICENSE[2]):
-                # Remove the rank identifier from the start of the line
-                line = line[len(Frame.LICENSE[2]):]
-                license_gear = [t.strip().lower() for t in line.split(",")]
-                self.license[1] = license_gear
-            elif line.startswith(Frame.LICENSE[3]):
-                # Remove the rank identifier from the start of the line
-                line = line[len(Frame.LICENSE[3]):]
-                license_gear = [t.strip().lower() for t in line.split(",")]
-                self.license[2] = license_gear
+        self.core_system["active_effect"] = combine_lines(islice(raw_text, act + 1, end))
 
     def parse_tags(self, tagline):
         """
@@ -298,19 +320,4 @@ class Frame:
                          "val": int(words[-1])}
                 else:
                     d = {"id": "tg_"+(t.strip().lower().replace(" ", "_"))}
-                if not is_duplicate_tag(d, self.core_system["tags"]):
-                    self.core_system["tags"].append(d)
-
-    def to_dict(self):
-        return {"id": self.id,
-                "source": self.source,
-                "name": self.name,
-                "mechtype": self.mechtype,
-                "y_pos": self.y_pos,
-                "description": self.description,
-                "mounts": self.mounts,
-                "stats": self.stats,
-                "traits": self.traits,
-                "core_system": self.core_system,
-                "data_type": self.data_type,
-                "aptitude": self.aptitude}
+                self.core_system["tags"].add(d)
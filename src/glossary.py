@@ -2,13 +2,17 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class GlossaryItem:
+class GlossaryItem(Record):
     """
     Class for combat glossary entries.
     """
 
+    __slots__ = ("name", "description")
+    FIELDS = ["name", "description"]
+
     START = ["COMBAT TERMINOLOGY\n",
              "ARMOR: All kinetic, energy, and explosive",
              "BONUS DAMAGE: Extra damage – kinetic"]
@@ -44,7 +48,3 @@ class GlossaryItem:
 
     def set_desc(self, new_desc):
         self.description = new_desc
-
-    def to_dict(self):
-        return {"name": self.name,
-                "description": self.description}
@@ -0,0 +1,66 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+import re
+from enum import Enum
+
+from corebonus import CoreBonus
+from frame import Frame
+from licensegear import Weapon
+from manufacturer import Manufacturer
+
+
+class HunkKind(Enum):
+    """The kinds of data a hunk of the frames section can hold."""
+    FRAME = "frame"
+    MANUFACTURER = "manufacturer"
+    CORE_BONUS = "core bonus"
+    GMS_WEAPON = "GMS weapon"
+    WEAPON = "weapon"
+    MOD = "mod"
+    SYSTEM = "system"
+    OTHER = "other"
+
+
+# Matches any of the keywords that mark a line as a weapon's range or damage.
+WEAPON_KEYWORDS = re.compile("|".join(re.escape(k) for k in Weapon.RANGE + Weapon.DAMAGE))
+MANUFACTURER_TITLES = frozenset(Manufacturer.TITLES)
+
+
+def classify_hunk(hunk, gms_sec="NONE"):
+    """
+    Determine what kind of data a hunk of the frames section is for. Each line
+    of the hunk is examined at most once.
+    A weapon is a hunk with a line containing a bracketed range or damage
+    keyword, a mod has "Mod" on its second line, and a system has a "---"
+    separator line and is neither a weapon nor a mod.
+    @param hunk: [str]: The lines of the hunk.
+    @param gms_sec: str: The GMS subsection the hunk is in ("Weapons",
+    "Systems", "Flight", or "NONE"). Every hunk in a GMS subsection is a GMS
+    weapon or a system, unless it is a frame, manufacturer or core bonus.
+    @return: HunkKind: The kind of hunk.
+    """
+    is_weapon = False
+    has_separator = False
+    for line in hunk:
+        if line == Frame.CORE_STATS:
+            return HunkKind.FRAME
+        elif line == "---\n":
+            has_separator = True
+        elif (not is_weapon and "[" in line and "]" in line
+              and WEAPON_KEYWORDS.search(line) is not None):
+            is_weapon = True
+
+    if hunk[0] in MANUFACTURER_TITLES:
+        return HunkKind.MANUFACTURER
+    elif CoreBonus.CORE in hunk[0]:
+        return HunkKind.CORE_BONUS
+    elif gms_sec == "Weapons":
+        return HunkKind.GMS_WEAPON
+    elif is_weapon:
+        return HunkKind.WEAPON
+    elif len(hunk) >= 2 and "Mod" in hunk[1]:
+        return HunkKind.MOD
+    elif has_separator or gms_sec == "Systems" or gms_sec == "Flight":
+        return HunkKind.SYSTEM
+    return HunkKind.OTHER
@@ -1,14 +1,73 @@
 # /bin/python3
 # -*- utf-8 -*-
 
+import re
+from enum import IntFlag
+from itertools import combinations
+
 from parseutil import *
+from serializers import Record
+from statline import StatGrammar
 
 
-class IMechGear:
+class WeaponType(IntFlag):
+    """
+    Weapon types, as bit flags so that a set of types (e.g. the weapons a mod
+    can be applied to) fits in one int, and checking it against a weapon is a
+    single AND.
+    """
+    MELEE = 0x01
+    CQB = 0x02
+    RIFLE = 0x04
+    LAUNCHER = 0x08
+    CANNON = 0x10
+    NEXUS = 0x20
+
+    @staticmethod
+    def of(name):
+        """
+        @param name: str: A weapon type, in any case (e.g. "Rifle").
+        @return: WeaponType: The type's flag, or 0 if it isn't a weapon type.
+        """
+        return WeaponType.__members__.get(name.upper(), 0)
+
+
+ALL_WEAPON_TYPES = WeaponType(0x3f)
+RANGED_WEAPON_TYPES = ALL_WEAPON_TYPES & ~WeaponType.MELEE
+
+
+def render_weapon_types(types):
+    """
+    Describe a set of weapon types the way mods list what they apply to.
+    @param types: WeaponType: The types.
+    @return: ([str], str): The lower case type names, in the order of
+    Weapon.TYPES, and the user-visible string for them, e.g. "Any Ranged" or
+    "cqb, rifle, or cannon".
+    """
+    names = [t.name.lower() for t in WeaponType if t & types]
+    if types == ALL_WEAPON_TYPES:
+        string = "Any"
+    elif types == RANGED_WEAPON_TYPES:
+        string = "Any Ranged"
+    elif len(names) > 2:
+        string = ", ".join(names[:-1]) + ", or " + names[-1]
+    else:
+        string = " or ".join(names)
+    return names, string
+
+
+# The rendering of every set of weapon types, indexed by the set.
+WEAPON_TYPE_STRINGS = [render_weapon_types(WeaponType(i)) for i in range(ALL_WEAPON_TYPES + 1)]
+
+
+class IMechGear(Record):
     """
     Interface for mech gear, defining common methods.
     """
 
+    __slots__ = ("id", "name", "sp", "tags", "source", "license", "license_level", "effect",
+                 "description", "data_type", "aptitude")
+
     def parse_tags(self, tagline):
         """
         Parse tags for mech gear.
@@ -49,25 +108,24 @@ class IMechGear:
                 if val is not None:
                     d["val"] = val
                 # Don't add non-existent tags
-                if d["id"] != "tg_" and not is_duplicate_tag(d, self.tags):
-                    self.tags.append(d)
+                if d["id"] != "tg_":
+                    self.tags.add(d)
 
-    def set_level(self, lic_table):
+    def set_level(self, lic_index):
         """
         Set the license and level for the piece of gear.
-        @param lic_table: [[str]]: 1st index is the license level, 2nd index is the
-        name of the gear/frame that unlocks at that level.
+        @param lic_index: LicenseIndex: The license of the frame the gear
+        belongs to.
         @return: None.
         """
-        for i in range(len(lic_table)):
-            for item in lic_table[i]:
-                if " frame" in item:
-                    self.license = item[:item.find(" frame")].upper()
-                if self.name.lower() == item.lower():
-                    self.license_level = i+1
+        if lic_index.license != "":
+            self.license = lic_index.license
+        found = lic_index.lookup(self.name)
+        if found is not None:
+            self.license_level = found[1]
         if self.license_level == "":
             print(f"Problem setting level for {self.name}")
-            for line in lic_table:
+            for line in lic_index.table:
                 print(f"    {line}")
 
 
@@ -78,9 +136,17 @@ class Mod(IMechGear):
     * Each weapon must be preceded and followed by an empty line.
     """
 
+    __slots__ = ("applied_types", "added_tags", "added_range", "added_damage")
+    FIELDS = ["id", "name", "sp", "applied_to", "applied_string", "source", "license",
+              "license_level", "effect", "description", "data_type", "aptitude",
+              ("tags", "obj.tags.to_list()", "len(obj.tags) > 0"),
+              ("added_tags", "obj.added_tags", "len(obj.added_tags) > 0"),
+              ("added_range", "obj.added_range", "len(obj.added_range) > 0"),
+              ("added_damage", "obj.added_damage", "len(obj.added_damage) > 0")]
+
     PREFIX = "wm_"
 
-    def __init__(self, raw_text=None, src="", lic_table=[]):
+    def __init__(self, raw_text=None, src="", lic_index=None):
         """
         Create a new weapon mod.
         @param raw_text: [str]: raw text.
@@ -89,9 +155,8 @@ class Mod(IMechGear):
         self.id = ""
         self.name = ""
         self.sp = 0
-        self.tags = []
-        self.applied_to = []
-        self.applied_string = ""
+        self.tags = TagSet()
+        self.applied_types = WeaponType(0)
         self.source = ""
         self.license = ""
         self.license_level = 0
@@ -105,8 +170,8 @@ class Mod(IMechGear):
 
         if raw_text is not None:
             self.parse_text(raw_text, src)
-        if len(lic_table) > 0:
-            self.set_level(lic_table)
+        if lic_index is not None:
+            self.set_level(lic_index)
 
     def __str__(self):
         output = "\n\n============== MOD ===================="
@@ -170,6 +235,20 @@ class Mod(IMechGear):
 
         self.parse_applied()
 
+    @property
+    def applied_to(self):
+        """
+        @return: [str]: The lower case types of weapon the mod applies to.
+        """
+        return list(WEAPON_TYPE_STRINGS[self.applied_types][0])
+
+    @property
+    def applied_string(self):
+        """
+        @return: str: User-visible description of the weapons the mod applies to.
+        """
+        return WEAPON_TYPE_STRINGS[self.applied_types][1]
+
     def parse_applied(self):
         """
         Check the effect line for the weapons this mod can apply to.
@@ -178,71 +257,21 @@ class Mod(IMechGear):
         applied_list = self.effect[:self.effect.find(":")]
 
         # Find all the weapon types mentioned in the mod's effect.
+        types = WeaponType(0)
         for word in applied_list.strip().replace(",", "").split(" "):
-            if word.upper() in Weapon.TYPES:
-                self.applied_to.append(word.strip().lower())
-
-        # Create the applied string - user-visible string.
-        # Start by checking whether it works on all weapons.
-        applies_any = True
-        for w_type in Weapon.TYPES:
-            applies_any = applies_any and w_type in self.applied_to
-        if applies_any:
-            self.applied_string = "Any"
-        # It doesn't work on all weapons.
-        else:
-            # Next check whether it works on all ranged weapons.
-            ranged_types = Weapon.TYPES.copy()
-            ranged_types.remove("MELEE")
-            applies_ranged = True
-            for w_type in ranged_types:
-                applies_ranged = applies_ranged and w_type in self.applied_to
-            if applies_ranged:
-                self.applied_string = "Any Ranged"
-            # It doesn't apply to all ranged weapons.
-            # Add all the type strings together, with commas between.
-            else:
-                self.applied_string = ""
-                for a_t in self.applied_to:
-                    # First type becomes the base string.
-                    if self.applied_string == "":
-                        self.applied_string = a_t
-                    # Add the last weapon type, preceded by "or".
-                    elif a_t == self.applied_to[-1]:
-                        if len(self.applied_to) > 2:
-                            self.applied_string += ", or " + a_t
-                        else:
-                            self.applied_string += " or " + a_t
-                    # Not first and not last, just put a comma in between.
-                    else:
-                        self.applied_string += ", " + a_t
-        # If we get to here and applied_to and applied_string are empty, it applies to all.
-        if self.applied_string == "" and len(self.applied_to) == 0:
-            self.applied_to = [item.lower() for item in Weapon.TYPES]
-            self.applied_string = "Any"
-
-    def to_dict(self):
-        d = {"id": self.id,
-             "name": self.name,
-             "sp": self.sp,
-             "applied_to": self.applied_to,
-             "applied_string": self.applied_string,
-             "source": self.source,
-             "license": self.license,
-             "license_level": self.license_level,
-             "effect": self.effect,
-             "description": self.description,
-             "data_type": self.data_type,
-             "aptitude": self.aptitude}
-        if len(self.tags) > 0:
-            d["tags"] = self.tags
-        if len(self.added_tags) > 0:
-            d["added_tags"] = self.added_tags
-        if len(self.added_range) > 0:
-            d["added_range"] = self.added_range
-        if len(self.added_damage) > 0:
-            d["added_damage"] = self.added_damage
-        return d
+            types |= WeaponType.of(word)
+        # If no types are mentioned, it applies to all.
+        if types == 0:
+            types = ALL_WEAPON_TYPES
+        self.applied_types = types
+
+    def fits(self, weapon):
+        """
+        Check whether the mod can be applied to a weapon.
+        @param weapon: Weapon: The weapon.
+        @return: bool: True if the mod applies to the weapon's type.
+        """
+        return self.applied_types & WeaponType.of(weapon.type) != 0
 
 
 class System(IMechGear):
@@ -255,13 +284,32 @@ class System(IMechGear):
     * Gorgon license table missing hyphen in "SCYLLA-Class NHP".
     """
 
+    __slots__ = ("type",)
+    FIELDS = ["id", "name", "type", "sp", ("tags", "obj.tags.to_list()"), "source", "license",
+              "license_level", "effect", "description", "data_type", "aptitude"]
+
     GMS_SYSTEMS = "GMS General Market Systems\n"
     GMS_FLIGHT = "GMS Flight Systems\n"
     GMS_SYS_END = "You can fly when you Boost or make a standard move;"
 
     PREFIX = "ms_"
 
-    def __init__(self, raw_text=None, src="", lic_table=()):
+    # Lines of an AI's effect which give the system their tags.
+    AI_ACTION = re.compile(r"(?:Protocol|Quick Action|Full Action|Quick Tech|Full Tech|Reaction)"
+                           r"|.*, Protocol$")
+    # Phrases in a system's effect which mark its type. Each group is a marker.
+    EFFECT_MARKERS = re.compile(r"(?P<Deployable>Deployable)|(?P<Mine>\(Mine)|(?P<Grenade>\(Grenade)"
+                                r"|(?P<Drone>Drone)|(?P<Tech>(?i:tech (?:action|attack)))")
+    # Types given by the effect, in priority order, with the markers needed for each.
+    EFFECT_RULES = [("Deployable", {"Deployable"}),
+                    ("Deployable", {"Mine", "Grenade"}),
+                    ("Drone", {"Drone"}),
+                    ("Tech", {"Tech"})]
+    # Types given by tags. The first of the system's tags in here sets its type.
+    TAG_TYPES = dict([("tg_ai", "AI"), ("tg_drone", "Drone"), ("tg_deployable", "Deployable"),
+                      ("tg_shield", "Shield"), ("tg_quick_tech", "Tech"), ("tg_full_tech", "Tech")])
+
+    def __init__(self, raw_text=None, src="", lic_index=None):
         """
         Create a new system.
         @param raw_text: [str]: raw text.
@@ -271,7 +319,7 @@ class System(IMechGear):
         self.name = ""
         self.type = "System"
         self.sp = 0
-        self.tags = []
+        self.tags = TagSet()
         self.source = ""
         self.license = ""
         self.license_level = ""
@@ -282,8 +330,8 @@ class System(IMechGear):
 
         if raw_text is not None:
             self.parse_text(raw_text, src)
-        if len(lic_table) > 0:
-            self.set_level(lic_table)
+        if lic_index is not None:
+            self.set_level(lic_index)
 
     def __str__(self):
         output = "\n\n============== SYSTEM ===================="
@@ -346,58 +394,41 @@ class System(IMechGear):
         if "mech gains the AI" in raw_effect[0]:
             for line in raw_effect:
                 if line.startswith("- "):
-                    check_line = line.replace("- ", "", 1).strip()
+                    check_line = line[2:].strip()
                 else:
                     check_line = line.strip()
-                if (check_line.startswith("Protocol") or
-                        check_line.endswith(", Protocol") or
-                        check_line.startswith("Quick Action") or
-                        check_line.startswith("Full Action") or
-                        check_line.startswith("Quick Tech") or
-                        check_line.startswith("Full Tech") or
-                        check_line.startswith("Reaction")):
+                if System.AI_ACTION.match(check_line) is not None:
                     self.parse_tags(check_line)
 
         # Set system type based on tags
         for tag in self.tags:
-            if tag["id"] == "tg_ai":
-                self.type = "AI"
+            if tag["id"] in System.TAG_TYPES:
+                self.type = System.TAG_TYPES[tag["id"]]
                 break
-            elif tag["id"] == "tg_drone":
-                self.type = "Drone"
-                break
-            elif tag["id"] == "tg_deployable":
-                self.type = "Deployable"
-                break
-            elif tag["id"] == "tg_shield":
-                self.type = "Shield"
-                break
-            elif tag["id"] == "tg_quick_tech" or tag["id"] == "tg_full_tech":
-                self.type = "Tech"
-                break
-        # Set system type based on effect
-        if ("Deployable" in self.effect
-                or ("(Mine" in self.effect and "(Grenade" in self.effect)):
-            self.type = "Deployable"
-        elif ("Drone" in self.effect):
-            self.type = "Drone"
-        elif ("tech action" in self.effect.lower() or
-              "tech attack" in self.effect.lower()):
-            self.type = "Tech"
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "type": self.type,
-                "sp": self.sp,
-                "tags": self.tags,
-                "source": self.source,
-                "license": self.license,
-                "license_level": self.license_level,
-                "effect": self.effect,
-                "description": self.description,
-                "data_type": self.data_type,
-                "aptitude": self.aptitude}
+        # Set system type based on effect, which takes priority over tags.
+        markers = frozenset(m.lastgroup for m in System.EFFECT_MARKERS.finditer(self.effect))
+        self.type = SYSTEM_EFFECT_TYPES.get(markers, self.type)
+
+
+def effect_types():
+    """
+    Work out the type given by every set of markers a system's effect can have.
+    @return: dict: Maps frozenset of markers -> str: the type, for each set of
+    markers which gives a type.
+    """
+    names = list(System.EFFECT_MARKERS.groupindex)
+    table = dict()
+    for n in range(len(names) + 1):
+        for markers in combinations(names, n):
+            for sys_type, needed in System.EFFECT_RULES:
+                if needed.issubset(markers):
+                    table[frozenset(markers)] = sys_type
+                    break
+    return table
+
+
+# Maps each set of effect markers which gives a system a type -> the type.
+SYSTEM_EFFECT_TYPES = effect_types()
 
 
 class Weapon(IMechGear):
@@ -413,6 +444,12 @@ class Weapon(IMechGear):
     * Displacer: separate range and blast into their own brackets.
     """
 
+    __slots__ = ("mount", "type", "damage", "range", "expected_damage")
+    FIELDS = ["id", "name", "mount", "type", "damage", "range", ("tags", "obj.tags.to_list()"),
+              "source", "license", "license_level", "effect", "description", "data_type", "aptitude",
+              ("sp", "obj.sp", "hasattr(obj, \"sp\")"),
+              ("expected_damage", "obj.expected_damage", "obj.expected_damage is not None")]
+
     PREFIX = "mw_"
 
     GMS_WEP_TABLE = "GMS Mech Weapons\n"
@@ -447,15 +484,16 @@ class Weapon(IMechGear):
     MOUNTS = ["Auxiliary", "Main", "Heavy", "Superheavy"]
     RANGE = ["range", "threat", "burst", "blast", "cone", "line"]
     DAMAGE = ["damage", "heat", "burn"]
+    STATS = StatGrammar(RANGE, DAMAGE)
 
-    def __init__(self, raw_text=None, gms=None, src="", lic_table=[]):
+    def __init__(self, raw_text=None, gms=None, src="", lic_index=None):
         self.id = ""
         self.name = ""
         self.mount = ""
         self.type = ""
         self.damage = []
         self.range = []
-        self.tags = []
+        self.tags = TagSet()
         self.source = ""
         self.license = ""
         self.license_level = ""
@@ -463,11 +501,13 @@ class Weapon(IMechGear):
         self.description = ""
         self.data_type = "weapon"
         self.aptitude = dict([])
+        # Only set when expected damage is requested.
+        self.expected_damage = None
 
         if raw_text is not None:
             self.parse_text(raw_text, gms, src)
-        if len(lic_table) > 0:
-            self.set_level(lic_table)
+        if lic_index is not None:
+            self.set_level(lic_index)
 
     def __str__(self):
         output = "\n\n============== WEAPON ===================="
@@ -588,95 +628,8 @@ class Weapon(IMechGear):
         """
         Parse the range and damage spec line.
         @param line: str: The line with range and damage.
-        @param gms: bool: If True, use GMS table parsing.
         @return: None.
         """
-        parts = line.strip().split("]")
-        if "" in parts:
-            parts.remove("")
-        for part in parts:
-            # Remove the other square bracket
-            part = part.replace("[", "").strip()
-            words = part.split(" ")
-
-            # Mimic gun special case
-            if "???" in words:
-                if "range" in words:
-                    d = dict([
-                        ("override", True),
-                        ("type", "Range"),
-                        ("val", "???")
-                    ])
-                    self.range.append(d)
-                elif "damage" in words:
-                    d = dict([
-                        ("override", True),
-                        ("val", "??? kinetic")
-                    ])
-                    self.damage.append(d)
-            # Parse range stat
-            elif words[0] in Weapon.RANGE:
-                if " or " in part:
-                    parts.append(part[part.rfind(" or ")+4:])
-
-                r_type = words[0].strip().title()
-                val = words[1].strip()
-                if val.isdecimal():
-                    val = int(val)
-                d = dict([
-                    ("type", r_type),
-                    ("val", val)
-                ])
-                self.range.append(d)
-            else:
-                # Check whether this part is a damage stat
-                dmg = False
-                for harm in Weapon.DAMAGE:
-                    if harm in part:
-                        dmg = True
-                        break
-                # Parse damage stat
-                if dmg:
-                    d_type = ""
-                    val = ""
-                    # If the damage stat has "or" in it, it's variable
-                    if " or " in part:
-                        d_type = "variable"
-                    for word in words:
-                        word = word.strip()
-
-                        if word.isdecimal():
-                            val = int(word)
-                        elif is_die_roll(word):
-                            val = word
-                        elif word != "damage" and word != "+":
-                            d_type = word
-
-                        if val != "" and d_type != "":
-                            d = dict([
-                                ("type", d_type),
-                                ("val", val)
-                            ])
-                            self.damage.append(d)
-                            d_type = val = ""
-
-    def to_dict(self):
-        d = dict([
-            ("id", self.id),
-            ("name", self.name),
-            ("mount", self.mount),
-            ("type", self.type),
-            ("damage", self.damage),
-            ("range", self.range),
-            ("tags", self.tags),
-            ("source", self.source),
-            ("license", self.license),
-            ("license_level", self.license_level),
-            ("effect", self.effect),
-            ("description", self.description),
-            ("data_type", self.data_type),
-            ("aptitude", self.aptitude),
-        ])
-        if hasattr(self, "sp"):
-            d["sp"] = self.sp
-        return d
+        stats = Weapon.STATS.parse(line)
+        self.range += [r.to_dict() for r in stats.ranges]
+        self.damage += [d.to_dict() for d in stats.damage]
@@ -0,0 +1,55 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+
+class LicenseIndex:
+    """
+    Lookup table for a frame's license: which license and level unlock each
+    piece of gear. Built once from the frame's license table, so gear can find
+    its license level with a single dict lookup. Indexes for several frames can
+    be combined with update() to look up gear across the whole catalog.
+    """
+
+    def __init__(self, lic_table=()):
+        """
+        Build the index.
+        @param lic_table: [[str]]: 1st index is the license level, 2nd index is the
+        name of the gear/frame that unlocks at that level.
+        """
+        self.table = lic_table
+        # The license the table belongs to, taken from the frame's entry.
+        self.license = ""
+        # Maps lower case gear name -> (license, level).
+        self.gear = dict()
+
+        for level in lic_table:
+            for item in level:
+                if " frame" in item:
+                    self.license = item[:item.find(" frame")].upper()
+        for i in range(len(lic_table)):
+            for item in lic_table[i]:
+                self.gear[item.lower()] = (self.license, i+1)
+
+    def __len__(self):
+        return len(self.gear)
+
+    def __contains__(self, name):
+        return name.lower() in self.gear
+
+    def lookup(self, name):
+        """
+        Find which license and level unlock a piece of gear.
+        @param name: str: The name of the gear.
+        @return: (str, int): The license and level, or None if the gear isn't
+        in the index.
+        """
+        return self.gear.get(name.lower())
+
+    def update(self, other):
+        """
+        Add the entries from another index to this one. Entries for gear
+        already in this index are replaced.
+        @param other: LicenseIndex: The index to add.
+        @return: None.
+        """
+        self.gear.update(other.gear)
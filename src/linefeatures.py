@@ -0,0 +1,81 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+from array import array
+
+
+class LineFeatures:
+    """
+    Per-line facts about the raw text which the section parsers use to find
+    boundaries: blank lines, lines in all caps, and lines with a colon near
+    the start. They are worked out once when a section's lines are decoded
+    and stored as one byte of bit flags per line.
+    """
+
+    BLANK = 0x01
+    CAPS = 0x02
+    COLON = 0x04
+
+    # How far into a line a ": " can be to count as a colon prefix.
+    COLON_WIDTH = 40
+
+    def __init__(self, lines=(), flags=None):
+        """
+        Compute the features of some lines.
+        @param lines: [str]: The lines.
+        @param flags: array('B'): Precomputed flags to use instead of lines.
+        """
+        if flags is None:
+            flags = array('B', map(LineFeatures.line_flags, lines))
+        self.flags = flags
+
+    def __len__(self):
+        return len(self.flags)
+
+    def __getitem__(self, idx):
+        """
+        @param idx: int or slice: The line(s) to get.
+        @return: int: The flags of the line, or a LineFeatures for a slice.
+        """
+        if isinstance(idx, slice):
+            return LineFeatures(flags=self.flags[idx])
+        return self.flags[idx]
+
+    @staticmethod
+    def line_flags(line):
+        """
+        Compute the flags for a single line.
+        @param line: str: The line, including its newline.
+        @return: int: The line's flags.
+        """
+        flags = 0
+        if line == "\n":
+            flags |= LineFeatures.BLANK
+        if line.isupper():
+            flags |= LineFeatures.CAPS
+        if ": " in line[:LineFeatures.COLON_WIDTH]:
+            flags |= LineFeatures.COLON
+        return flags
+
+    def is_set(self, idx, flag):
+        """
+        Check a line's flags.
+        @param idx: int: The line.
+        @param flag: int: The flag(s) to check.
+        @return: bool: True if any of flag is set for the line.
+        """
+        return self.flags[idx] & flag != 0
+
+    def lines_with(self, flag, start=0, end=None):
+        """
+        Find the lines which have a flag set.
+        @param flag: int: The flag(s) to look for.
+        @param start: int: The first line to check.
+        @param end: int: The line to stop checking at (exclusive). Defaults to
+        the last line.
+        @return: [int]: The indexes of lines with any of flag set, in order.
+        """
+        if end is None:
+            end = len(self.flags)
+        flags = self.flags
+        return [i for i in range(start, end) if flags[i] & flag]
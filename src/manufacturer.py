@@ -2,15 +2,19 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Manufacturer:
+class Manufacturer(Record):
     """
     Class for manufacturer entry.
     NECESSARY PREP WORK:
     * None yet.
     """
 
+    __slots__ = ("id", "name", "logo", "color", "quote", "description")
+    FIELDS = ["id", "name", "logo", "color", "quote", "description"]
+
     PREFIX = "mfr_"
 
     GMS = ("General Massive Systems\n", "General Massive Systems – GMS for short –", "GMS")
@@ -19,6 +23,7 @@ class Manufacturer:
     HORUS = ("HORUS\n", "HORUS is an oddity among the various pan-galactic", "HORUS")
     HA = ("Harrison Armory\n", "Harrison Armory enjoys a galaxy-wide reputation for the quality", "HA")
     TITLES = [GMS[0], IPSN[0], SSC[0], HORUS[0], HA[0]]
+    IDS = [GMS[2], IPSN[2], SSC[2], HORUS[2], HA[2]]
 
     def __init__(self, raw=""):
         self.id = ""
@@ -77,11 +82,3 @@ class Manufacturer:
                 self.description = line.strip()
             else:
                 self.description += "<br><br>" + line.strip()
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "logo": self.logo,
-                "color": self.color,
-                "quote": self.quote,
-                "description": self.description}
@@ -2,9 +2,10 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class NPCClass:
+class NPCClass(Record):
     """
     Class for NPC classes.
     NECESSARY PREP WORK:
@@ -12,6 +13,12 @@ class NPCClass:
     * 1 empty line before and after "Base Systems" and "Optional Systems".
     """
 
+    __slots__ = ("id", "name", "role", "info", "tier_stats", "base_feat", "opt_feat", "power")
+    FIELDS = ["id", "name", "role", "info", "stats",
+              ("base_features", "obj.base_feat"),
+              ("optional_features", "obj.opt_feat"),
+              "power"]
+
     START = ["Ace\n",
              "Striker\n",
              "The first person to embody the “Ace” archetype was Aisling"]
@@ -49,6 +56,10 @@ class NPCClass:
         ("size", "size"),
         ("activations", "activations")
     ])
+    # The stats every class has, in output order. Each has a value per tier.
+    STAT_LAYOUT = ("armor", "hp", "evade", "edef", "heatcap", "speed", "sensor", "save", "hull",
+                   "agility", "systems", "engineering", "size", "activations")
+    STAT_INDEX = dict((key, i) for i, key in enumerate(STAT_LAYOUT))
 
     def __init__(self, raw_text=None):
         self.id = ""
@@ -58,23 +69,8 @@ class NPCClass:
             ("flavor", ""),
             ("tactics", "")
         ])
-        arr = [0 for i in range(3)]
-        self.stats = dict([
-            ("armor", arr.copy()),
-            ("hp", arr.copy()),
-            ("evade", arr.copy()),
-            ("edef", arr.copy()),
-            ("heatcap", arr.copy()),
-            ("speed", arr.copy()),
-            ("sensor", arr.copy()),
-            ("save", arr.copy()),
-            ("hull", arr.copy()),
-            ("agility", arr.copy()),
-            ("systems", arr.copy()),
-            ("engineering", arr.copy()),
-            ("size", arr.copy()),
-            ("activations", [1 for i in range(3)])
-        ])
+        # The tier 1, 2 and 3 values of each stat in STAT_LAYOUT, one after another.
+        self.tier_stats = [0] * (3 * len(NPCClass.STAT_LAYOUT) - 3) + [1, 1, 1]
         self.base_feat = []
         self.opt_feat = []
         self.power = 100
@@ -101,6 +97,24 @@ class NPCClass:
         output += f"\npower: {self.power}"
         return output
 
+    @property
+    def stats(self):
+        """
+        @return: dict: Maps each stat -> [tier 1, tier 2, tier 3] values.
+        """
+        t = self.tier_stats
+        return dict((key, t[3*i:3*i + 3]) for i, key in enumerate(NPCClass.STAT_LAYOUT))
+
+    def set_stat(self, key, tier, val):
+        """
+        Set one tier of a stat.
+        @param key: str: The stat, as in STAT_LAYOUT.
+        @param tier: int: The tier, 0-2. -1 is tier 3.
+        @param val: The value.
+        @return: None.
+        """
+        self.tier_stats[3*NPCClass.STAT_INDEX[key] + tier % 3] = val
+
     def parse_text(self, raw):
         """
         Parse the raw text for an NPC class.
@@ -157,23 +171,13 @@ class NPCClass:
                             val.append(0.5)
                         else:
                             val.append(p)
-                    self.stats[key][tier] = val
+                    self.set_stat(key, tier, val)
                 else:
                     val = val.strip().replace("+", "").replace("–", "-")
                     if val.replace("-", "").isdecimal():
-                        self.stats[key][tier] = int(val)
+                        self.set_stat(key, tier, int(val))
                     elif val.replace("-", "").isnumeric():
-                        self.stats[key][tier] = float(val)
+                        self.set_stat(key, tier, float(val))
                     else:
                         print(f"NPC {self.name}, stat {key}: {val}")
-                        self.stats[key][tier] = val
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "role": self.role,
-                "info": self.info,
-                "stats": self.stats,
-                "base_features": self.base_feat,
-                "optional_features": self.opt_feat,
-                "power": self.power}
+                        self.set_stat(key, tier, val)
@@ -2,7 +2,9 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record, extend_fields
 from licensegear import Weapon
+from statline import StatGrammar
 from npcclass import NPCClass
 import re
 
@@ -26,16 +28,23 @@ def new_npc_feature(raw):
     return feat
 
 
-class NPCFeature:
+class NPCFeature(Record):
     """
     Class for NPC features.
     """
 
+    __slots__ = ("id", "name", "origin", "locked", "type", "effect", "tags")
+    FIELDS = ["id", "name", "origin", "locked", "type", "effect", ("tags", "obj.tags.to_list()")]
+
     PREFIX = "npcf_"
 
     BASE_SYS = "base systems\n"
     OPT_SYS = "optional systems\n"
 
+    FILTER_TAGS = ["tg_system",
+                   "tg_trait",
+                   "tg_template_feature"]
+
     IGNORE_TAGS = ["system",
                    "reaction",
                    "trait",
@@ -52,7 +61,7 @@ class NPCFeature:
         self.locked = False
         self.type = ""
         self.effect = ""
-        self.tags = []
+        self.tags = TagSet()
 
         if raw_text:
             self.parse_text(raw_text)
@@ -77,15 +86,6 @@ class NPCFeature:
         self.name = raw[0].strip().upper()
         self.id = gen_id(NPCFeature.PREFIX, self.name)
 
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "origin": self.origin,
-                "locked": self.locked,
-                "type": self.type,
-                "effect": self.effect,
-                "tags": self.tags}
-
     def parse_tag(self, tag_text):
         """
         Parse tags for NPC feature.
@@ -125,13 +125,11 @@ class NPCFeature:
         if val is not None:
             d["val"] = val
         # Don't add non-existent tags
-        if d["id"] != "tg_" and not is_duplicate_tag(d, self.tags):
-            self.tags.append(d)
+        if d["id"] != "tg_":
+            self.tags.add(d)
 
     def filter_tags(self):
-        for t in self.tags:
-            if t["id"] == "tg_system" or t["id"] == "tg_trait" or t["id"] == "tg_template_feature":
-                self.tags.remove(t)
+        self.tags.remove_all(NPCFeature.FILTER_TAGS)
 
     def wrap_tier_effects(self):
         pattern = re.compile(r'\+?\d*/\+?\d*/\+?\d*')
@@ -158,6 +156,18 @@ class NPCWeapon(NPCFeature):
     Class for NPC weapons.
     """
 
+    __slots__ = ("w_type", "attack_bonus", "accuracy", "damage", "range", "on_hit")
+    FIELDS = extend_fields(NPCFeature.FIELDS, [
+        ("weapon_type", "obj.w_type"),
+        "attack_bonus",
+        ("accuracy", "obj.accuracy", "any(x != 0 for x in obj.accuracy)"),
+        "damage",
+        "range",
+        "on_hit"])
+
+    # NPC stat lines use title case keywords, and damage is per tier.
+    STATS = StatGrammar(Weapon.RANGE, Weapon.DAMAGE, ignore_case=True, tiered=True, unknown=False)
+
     def __init__(self, raw_text=None):
         super().__init__()
         self.type = "Weapon"
@@ -252,71 +262,9 @@ class NPCWeapon(NPCFeature):
         @param line: str: The line with range and damage.
         @return: None.
         """
-        parts = [p.replace("[", "").strip() for p in line.strip().split("]")]
-        parts.remove("")
-        for part in parts:
-            words = [w.strip() for w in part.split(" ")]
-
-            # Parse range stat
-            if words[0].lower() in Weapon.RANGE:
-                if " or " in part:
-                    parts.append(part[part.rfind(" or ")+4:])
-
-                r_type = words[0].title()
-                val = words[1]
-                if val.isdecimal():
-                    val = int(val)
-                d = dict([
-                    ("type", r_type),
-                    ("val", val)
-                ])
-                self.range.append(d)
-            else:
-                # Check whether this part is a damage stat
-                dmg = False
-                for harm in Weapon.DAMAGE:
-                    if harm in part.lower():
-                        dmg = True
-                        break
-                # Parse damage stat
-                if dmg:
-                    d_type = ""
-                    val = []
-                    # If the damage stat has "or" in it, it's variable
-                    if " or " in part:
-                        d_type = "variable"
-                    for word in words:
-                        word = word.strip()
-
-                        if word.isdecimal():
-                            val = [int(word) for i in range(3)]
-                        elif "/" in word:
-                            val = [int(v.strip()) for v in word.split("/")]
-                        elif word != "damage" and word != "+":
-                            d_type = word
-
-                        if len(val) > 0 and d_type != "":
-                            d = dict([
-                                ("type", d_type),
-                                ("damage", val)
-                            ])
-                            self.damage.append(d)
-                            d_type = ""
-                            val = []
-
-    def to_dict(self):
-        d = super().to_dict()
-        d["weapon_type"] = self.w_type
-        d["attack_bonus"] = self.attack_bonus
-        for x in self.accuracy:
-            if x != 0:
-                d["accuracy"] = self.accuracy
-                break
-        d["damage"] = self.damage
-        d["range"] = self.range
-        d["on_hit"] = self.on_hit
-        d["tags"] = self.tags
-        return d
+        stats = NPCWeapon.STATS.parse(line)
+        self.range += [r.to_dict() for r in stats.ranges]
+        self.damage += [d.to_dict("damage") for d in stats.damage]
 
 
 class NPCTech(NPCFeature):
@@ -324,6 +272,12 @@ class NPCTech(NPCFeature):
     Class for NPC tech actions.
     """
 
+    __slots__ = ("t_type", "attack_bonus", "accuracy")
+    FIELDS = extend_fields(NPCFeature.FIELDS, [
+        ("tech_type", "obj.t_type"),
+        ("attack_bonus", "obj.attack_bonus", "obj.attack_bonus"),
+        ("accuracy", "obj.accuracy", "any(x != 0 for x in obj.accuracy)")])
+
     def __init__(self, raw_text=None):
         super().__init__()
         self.type = "Tech"
@@ -401,23 +355,16 @@ class NPCTech(NPCFeature):
             val = [-int(val) for i in range(3)]
         self.accuracy = val
 
-    def to_dict(self):
-        d = super().to_dict()
-        d["tech_type"] = self.t_type
-        if self.attack_bonus:
-            d["attack_bonus"] = self.attack_bonus
-        for x in self.accuracy:
-            if x != 0:
-                d["accuracy"] = self.accuracy
-                break
-        return d
-
 
 class NPCTrait(NPCFeature):
     """
     Class for NPC traits.
     """
 
+    __slots__ = ("bonus",)
+    FIELDS = extend_fields(NPCFeature.FIELDS, [
+        ("bonus", "obj.bonus", "len(obj.bonus) > 0")])
+
     def __init__(self, raw_text=None):
         super().__init__()
         self.type = "Trait"
@@ -487,18 +434,14 @@ class NPCTrait(NPCFeature):
             self.parse_tag(t)
         self.filter_tags()
 
-    def to_dict(self):
-        d = super().to_dict()
-        if len(self.bonus.keys()) > 0:
-            d["bonus"] = self.bonus
-        return d
-
 
 class NPCSystem(NPCTrait):
     """
     Class for NPC systems.
     """
 
+    __slots__ = ()
+
     def __init__(self, raw_text=None):
         super().__init__(raw_text)
         self.type = "System"
@@ -525,6 +468,9 @@ class NPCReaction(NPCFeature):
     Class for NPC reactions.
     """
 
+    __slots__ = ("trigger",)
+    FIELDS = extend_fields(NPCFeature.FIELDS, ["trigger"])
+
     def __init__(self, raw_text=None):
         super().__init__()
         self.type = "Reaction"
@@ -564,8 +510,3 @@ class NPCReaction(NPCFeature):
         for t in tags:
             self.parse_tag(t)
         self.filter_tags()
-
-    def to_dict(self):
-        d = super().to_dict()
-        d["trigger"] = self.trigger
-        return d
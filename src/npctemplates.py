@@ -2,13 +2,20 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class NPCTemplate:
+class NPCTemplate(Record):
     """
     Class for NPC templates.
     """
 
+    __slots__ = ("id", "name", "description", "base_feat", "opt_feat", "power")
+    FIELDS = ["id", "name", "description",
+              ("base_features", "obj.base_feat"),
+              ("optional_features", "obj.opt_feat"),
+              "power"]
+
     START = ["Commander\n",
              "Commanders operate on a grand scale, controlling",
              "Template Features\n"]
@@ -67,11 +74,3 @@ class NPCTemplate:
             self.power = 100
         if self.name == NPCTemplate.ULTRA:
             self.power = 300
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "description": self.description,
-                "base_features": self.base_feat,
-                "optional_features": self.opt_feat,
-                "power": self.power}
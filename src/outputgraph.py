@@ -0,0 +1,104 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+
+class OutputGraph:
+    """
+    Dependency graph of the parser's outputs, for parsing only what's needed
+    to produce some of them. Each node is an output (e.g. "weapons") and
+    belongs to the section which parses it. A node's dependencies are the
+    other outputs of its section whose items have to be parsed to produce it,
+    e.g. weapons need the frames they belong to for their license levels.
+    Sections are parsed independently of each other, so dependencies can't
+    cross sections, and the sections any set of outputs needs can always be
+    run concurrently.
+    """
+
+    def __init__(self, nodes):
+        """
+        Build the graph.
+        @param nodes: [(str, str, [str])]: Each output's name, the section it
+        belongs to, and the outputs it depends on, in section order.
+        @raise ValueError: If a dependency is unknown, is in another section,
+        or is part of a cycle.
+        """
+        # Maps output -> section.
+        self.section = dict()
+        # Maps output -> [str]: the outputs it depends on.
+        self.deps = dict()
+        # Outputs in the order they were given.
+        self.order = []
+        for name, section, deps in nodes:
+            self.section[name] = section
+            self.deps[name] = list(deps)
+            self.order.append(name)
+        for name in self.order:
+            for dep in self.deps[name]:
+                if dep not in self.section:
+                    raise ValueError(f"Output {name} depends on unknown output {dep}")
+                if self.section[dep] != self.section[name]:
+                    raise ValueError(f"Output {name} depends on {dep} from another section")
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        # 0: not visited, 1: on the current path, 2: done.
+        state = dict((name, 0) for name in self.order)
+        for root in self.order:
+            if state[root] != 0:
+                continue
+            state[root] = 1
+            stack = [(root, iter(self.deps[root]))]
+            while len(stack) > 0:
+                name, deps = stack[-1]
+                dep = next(deps, None)
+                if dep is None:
+                    state[name] = 2
+                    stack.pop()
+                elif state[dep] == 1:
+                    raise ValueError(f"Outputs {name} and {dep} depend on each other")
+                elif state[dep] == 0:
+                    state[dep] = 1
+                    stack.append((dep, iter(self.deps[dep])))
+
+    def requires(self, names):
+        """
+        Find everything that has to be parsed to produce some outputs.
+        @param names: [str]: The outputs.
+        @return: set: The outputs and everything they depend on.
+        @raise ValueError: If an output is unknown.
+        """
+        needed = set()
+        pending = list(names)
+        while len(pending) > 0:
+            name = pending.pop()
+            if name not in self.section:
+                raise ValueError(f"Unknown output {name}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.deps[name])
+        return needed
+
+    def plan(self, names):
+        """
+        Work out which sections to run to produce some outputs.
+        @param names: [str]: The outputs.
+        @return: dict: Maps section -> [str]: the requested outputs it has to
+        write, in section order. Sections are in the order of their outputs.
+        @raise ValueError: If an output is unknown.
+        """
+        requested = set(names)
+        for name in requested:
+            if name not in self.section:
+                raise ValueError(f"Unknown output {name}")
+        plan = dict()
+        for name in self.order:
+            if name in requested:
+                plan.setdefault(self.section[name], []).append(name)
+        return plan
+
+    def outputs(self, section):
+        """
+        @param section: str: The section.
+        @return: [str]: The section's outputs, in order.
+        """
+        return [name for name in self.order if self.section[name] == section]
@@ -0,0 +1,68 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+
+class OverrideMask:
+    """
+    Override data read from a mask file. Entries are indexed by id, and
+    bucketed by their data type prefix (the id up to and including the first
+    "_", e.g. "tg_", "mw_", "npcf_"), so that looking up the overrides for a
+    parsed item doesn't require scanning the whole mask.
+    """
+
+    def __init__(self, entries=()):
+        """
+        Index the mask entries.
+        @param entries: [dict]: The mask entries, in file order.
+        """
+        self.entries = list(entries)
+        # Maps id -> [dict]: the entries with that id, in file order.
+        self.by_id = dict()
+        # Maps data type prefix -> [dict]: the entries with that prefix, in file order.
+        self.by_prefix = dict()
+        for m in self.entries:
+            self.by_id.setdefault(m["id"], []).append(m)
+            self.by_prefix.setdefault(OverrideMask.type_prefix(m["id"]), []).append(m)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    @staticmethod
+    def type_prefix(item_id):
+        """
+        Get the data type prefix of an id.
+        @param item_id: str: The id.
+        @return: str: item_id up to and including the first "_", or "" if
+        there is no "_".
+        """
+        return item_id[:item_id.find("_") + 1]
+
+    def matching(self, item_id):
+        """
+        Get the entries which override an item.
+        @param item_id: str: The item's id.
+        @return: [dict]: The entries with that id, in file order.
+        """
+        return self.by_id.get(item_id, [])
+
+    def with_prefix(self, prefix):
+        """
+        Get the entries whose id starts with prefix.
+        @param prefix: str: The id prefix.
+        @return: [dict]: The matching entries, in file order.
+        """
+        # Data type prefixes can be looked up directly.
+        if prefix.endswith("_") and prefix.count("_") == 1:
+            return self.by_prefix.get(prefix, [])
+        return [m for m in self.entries if m["id"].startswith(prefix)]
+
+    def select(self, prefixes):
+        """
+        Get a mask containing only some of the entries.
+        @param prefixes: (str): The id prefixes to keep.
+        @return: OverrideMask: The entries whose id starts with one of prefixes.
+        """
+        return OverrideMask([m for m in self.entries if m["id"].startswith(prefixes)])
@@ -1,33 +1,33 @@
 #!/bin/python3
 # -*- utf-8 -*-
 
-"""Parses data from rulebook text"""
+"""
+Parses data from rulebook text. Run it from the command line to write JSON
+files to ../output/, or import it and call parse() to get the records back
+directly.
+"""
 
 import argparse
+import contextlib
+import functools
+import importlib
+import io
 import json
+import os
 import time
-# import asyncio
-from deepmerge import always_merger
-
-from frame import Frame
-from manufacturer import Manufacturer
-from corebonus import CoreBonus
-from licensegear import Mod, System, Weapon
-from talents import Talent
-from tags import Tag
-from pilotgear import PilotGear
-from skills import Skill
-from statuses import Status
-from glossary import GlossaryItem
-from backgrounds import Background
-from actions import Action
-from reserves import Reserve
-from npcclass import *
-from npcfeatures import *
-from npctemplates import *
-from dataoutput import DataOutput
-
-rawLines = []
+
+from buildcache import BuildCache
+from dataoutput import DataOutput, RecordOutput, StdoutOutput, output_name
+from linefeatures import LineFeatures
+from outputgraph import OutputGraph
+from overridemask import OverrideMask
+from parseutil import iter_hunks
+from rawsource import RawSource
+from sectionindex import SectionIndex
+from serializers import encode_record
+from timings import TIMINGS
+
+rawSource = None
 
 # Output file names
 CORE_BONUSES = "../output/core_bonuses.json"
@@ -48,53 +48,20 @@ RESERVES = "../output/reserves.json"
 NPC_CLASSES = "../output/npc_classes.json"
 NPC_FEATURES = "../output/npc_features.json"
 NPC_TEMPLATES = "../output/npc_templates.json"
-
-
-def check_section(start, end):
-    """
-    Checks which lines a section spans.
-    @param start: [str]: a set of lines defining the start of the section.
-    @param end: [str]: a set of lines defining the end of the section.
-    @return: (int, int): the start and end indexes within the raw text.
-    """
-    start_idx = -1
-    end_idx = -1
-    for i in range(len(rawLines)):
-        s_found = True
-        e_found = True
-        for j in range(len(start)):
-            # If lines i through i+j all match start, record the starting line.
-            if start_idx < 0:
-                s_found = s_found and rawLines[i + j].startswith(start[j])
-            if end_idx < 0:
-                e_found = e_found and rawLines[i + j].startswith((end[j]))
-            # Stop if a line doesn't match either the start or end delimiters.
-            if not s_found and not e_found:
-                break
-
-        if s_found and start_idx < 0:
-            start_idx = i
-        if e_found and end_idx < 0:
-            end_idx = i + j
-        if start_idx >= 0 and end_idx >= 0:
-            return start_idx, end_idx
-    print(f"There was a problem! s{start_idx}, e{end_idx}")
+# Record of the inputs each output was last built from
+CACHE = "../output/.section_cache.json"
 
 
 def read_override(file_name):
     """
-    Reads the override mask file and returns a list of dicts representing
-    the contents.
+    Reads the override mask file and indexes its contents.
     @param file_name: str: the name of the mask file.
-    @return: [dict]: JSON from the mask file, converted to list of dicts.
+    @return: OverrideMask: JSON from the mask file, converted to list of dicts
+    and indexed by id.
     """
     try:
         with open(file_name, 'r', encoding='utf-8') as mask_file:
-            file_lines = mask_file.readlines()
-        file_str = ""
-        for line in file_lines:
-            file_str += line
-        return json.loads(file_str)
+            return OverrideMask(json.load(mask_file))
     except FileNotFoundError:
         print(f"Mask file {file_name} not found.")
         exit(1)
@@ -104,19 +71,21 @@ def apply_override(original, mask):
     """
     Applies the given mask data.
     @param original: dict: The parsed data to be overridden.
-    @param mask: [dict]: The data read from the mask file.
+    @param mask: OverrideMask: The data read from the mask file.
     @return: dict: Returns a copy of original. Matching keys take the
     value from the mask, keys in the mask which aren't in original are
     added, and any list keys are merged.
     """
     result = original
     # Overrides need an ID to reference
-    if "id" in original.keys() and mask != []:
-        for m in mask:
-            # If there is a matching ID in the mask, insert/replace
-            #   all other elements of the mask into the original.
-            if m["id"] == original["id"]:
-                result = always_merger.merge(original, m)
+    if "id" in original.keys():
+        # If there is a matching ID in the mask, insert/replace
+        #   all other elements of the mask into the original.
+        matches = mask.matching(original["id"])
+        if len(matches) > 0:
+            from deepmerge import always_merger
+        for m in matches:
+            result = always_merger.merge(original, m)
     return result
 
 
@@ -124,201 +93,221 @@ def add_missing_overrides(js_list, mask, prefix, front=False):
     """
     Adds elements from the mask which aren't present in the parsed data.
     @param js_list: [dict]: The parsed data.
-    @param mask: [dict]: The data read from the mask file.
+    @param mask: OverrideMask: The data read from the mask file.
     @param prefix: str: The id prefix being handled.
-    @return: [dict]: Returns a copy of js_list. If there are id's in mask
-    which start with prefix and aren't present in js_list, they are inserted
-    into the returned copy.
+    @param front: bool: If True, missing elements are inserted at the start
+    of js_list instead of the end.
+    @return: None. If there are id's in mask which start with prefix and
+    aren't present in js_list, they are inserted into js_list.
     """
-    if mask == [] or js_list == []:
+    if len(mask) == 0 or js_list == []:
         return
-    for m in mask:
-        if m["id"].startswith(prefix):
-            present = False
-            for j in js_list:
-                if "id" in j.keys() and j["id"] == m["id"]:
-                    present = True
-                    break
-            if not present:
-                if front:
-                    js_list.insert(0, m)
-                else:
-                    js_list.append(m)
+    present = set([j["id"] for j in js_list if "id" in j.keys()])
+    missing = missing_overrides(mask, prefix, present)
+    if front:
+        # Each one used to be inserted at index 0 in turn, so they end up reversed.
+        js_list[0:0] = reversed(missing)
+    else:
+        js_list.extend(missing)
 
 
-def weapon_check(txt):
+def missing_overrides(mask, prefix, present):
     """
-    Check whether a text hunk is a weapon.
-    @param txt: [str]: The text hunk to check.
-    @return: bool: True if the hunk is a weapon.
+    Finds elements of the mask which aren't present in the parsed data.
+    @param mask: OverrideMask: The data read from the mask file.
+    @param prefix: str: The id prefix being handled.
+    @param present: set: The id's in the parsed data.
+    @return: [dict]: The mask entries whose id starts with prefix and isn't in
+    present, in mask order, without repeated id's.
     """
-    result = False
-    for line in txt:
-        for rng in Weapon.RANGE:
-            if "[" in line and "]" in line and rng in line:
-                return True
-        for dmg in Weapon.DAMAGE:
-            if "[" in line and "]" in line and dmg in line:
-                return True
-    return result
+    present = set(present)
+    missing = []
+    for m in mask.with_prefix(prefix):
+        if m["id"] not in present:
+            present.add(m["id"])
+            missing.append(m)
+    return missing
 
 
-def mod_check(txt):
+def output_records(section, items, mask, prefix, output, target, label, front=False):
     """
-    Check whether a text hunk is a weapon mod.
-    @param txt: [str]: The text hunk to check.
-    @return: bool: True if the hunk is a weapon mod.
+    Convert parsed items to JSON records, apply the mask, and write them out.
+    Items written to a file or the console are encoded straight to JSON; only
+    items with a mask override are converted to a dict first, to be merged.
+    @param section: str: The section the items are from, for timing.
+    @param items: [Record]: The parsed items.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param prefix: str: The id prefix of the items, for adding mask entries
+    which weren't parsed. None to only apply overrides to parsed items.
+    @param output: class: Creates the DataOutput for target.
+    @param target: str: The output file.
+    @param label: str: What the items are, for logging.
+    @param front: bool: Whether mask entries which weren't parsed go at the
+    start of the records instead of the end.
+    @return: None.
     """
-    if len(txt) >= 2 and "Mod" in txt[1]:
-        return True
-    return False
+    dOut = output(target)
+    if not isinstance(dOut, DataOutput):
+        with TIMINGS.phase(section, "serialize") as phase:
+            j = [item.to_dict() for item in items]
+            phase.records = len(j)
+        with TIMINGS.phase(section, "override") as phase:
+            j = [apply_override(record, mask) for record in j]
+            if prefix is not None:
+                add_missing_overrides(j, mask, prefix, front=front)
+            phase.records = len(j)
+        print(f"Outputting JSON for {len(items)} {label} to {dOut.target}")
+        with TIMINGS.phase(section, "write") as phase:
+            phase.bytes = dOut.write_json(j)
+            phase.records = len(j)
+        return
+
+    with TIMINGS.phase(section, "serialize") as phase:
+        # Maps index in items -> dict of the items with an override.
+        overridden = dict()
+        if len(mask) > 0:
+            for i in range(len(items)):
+                if len(mask.matching(getattr(items[i], "id", None))) > 0:
+                    overridden[i] = items[i].to_dict()
+        phase.records = len(items)
+    with TIMINGS.phase(section, "override") as phase:
+        for i in overridden:
+            overridden[i] = encode_record(apply_override(overridden[i], mask))
+        missing = []
+        if prefix is not None and len(mask) > 0 and len(items) > 0:
+            missing = [encode_record(m) for m in
+                       missing_overrides(mask, prefix, [getattr(item, "id", None) for item in items])]
+        phase.records = len(items) + len(missing)
+    print(f"Outputting JSON for {len(items)} {label} to {dOut.target}")
+    # Records without an override are encoded as they're written, so the
+    #   write phase includes encoding them.
+    with TIMINGS.phase(section, "write") as phase:
+        phase.bytes = dOut.write_encoded(encoded_records(items, overridden, missing, front))
+        phase.records = len(items) + len(missing)
 
 
-def sys_check(txt):
+def encoded_records(items, overridden, missing, front=False):
     """
-    Check whether a text hunk is a system.
-    @param txt: [str]: The text hunk to check.
-    @return: bool: True if the hunk is a system.
+    Encode output records one at a time, in output order.
+    @param items: [Record]: The parsed items.
+    @param overridden: dict: Maps index in items -> str: the encoded record of
+    each item with a mask override.
+    @param missing: [str]: Encoded mask entries which weren't parsed.
+    @param front: bool: Whether missing entries go at the start, in reverse
+    order, instead of the end.
+    @return: generator of str: The encoded records.
     """
-    result = False
-    for line in txt:
-        if line == "---\n":
-            result = True
-    return result and not mod_check(txt) and not weapon_check(txt)
+    if front:
+        yield from reversed(missing)
+    for i in range(len(items)):
+        if i in overridden:
+            yield overridden[i]
+        else:
+            yield items[i].to_json()
+    if not front:
+        yield from missing
 
 
-if __name__ == "__main__":
-    startTime = time.time()
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--stdout", help="Output to stdout instead of file.")
-    parser.add_argument("-t", "--talents", action="store_true",
-                        help="Generate talents JSON.")
-    parser.add_argument("-T", "--tags", action="store_true",
-                        help="Generate tag data JSON.")
-    parser.add_argument("-p", "--pilot-gear", action="store_true",
-                        help="Generate pilot gear JSON.")
-    parser.add_argument("-s", "--skills", action="store_true",
-                        help="Generate skill trigger JSON.")
-    parser.add_argument("-f", "--frames", action="store_true",
-                        help="Generate frame, core bonus, and mech gear JSON.")
-    parser.add_argument("-S", "--statuses", action="store_true",
-                        help="Generate status/condition JSON.")
-    parser.add_argument("-g", "--glossary", action="store_true",
-                        help="Generate combat glossary JSON.")
-    parser.add_argument("-b", "--backgrounds", action="store_true",
-                        help="Generate pilot background JSON.")
-    parser.add_argument("-a", "--actions", action="store_true",
-                        help="Generate player action JSON.")
-    parser.add_argument("-r", "--reserves", action="store_true",
-                        help="Generate reserves JSON.")
-    parser.add_argument("-N", "--NPCClasses", action="store_true",
-                        help="Generate NPC class JSON.")
-    parser.add_argument("-m", "--mask", nargs=1,
-                        help="Specify a mask file with overrides for specific id's.")
-    parser.add_argument("raw", help="raw text input file")
-    args = parser.parse_args()
+def add_expected_damage(section, weapons):
+    """
+    Work out the expected damage of each weapon, to be output with it.
+    @param section: str: The section the weapons are from, for timing.
+    @param weapons: [object]: The weapons. Each must have damage and
+    expected_damage attributes.
+    @return: None.
+    """
+    from dice import mean_damage
+    with TIMINGS.phase(section, "expected_damage") as phase:
+        for w, mean in zip(weapons, mean_damage([w.damage for w in weapons])):
+            w.expected_damage = mean
+        phase.records = len(weapons)
 
-    # Read raw file into memory - need to watch memory usage
-    try:
-        with open(args.raw, 'r', encoding='utf-8') as rawFile:
-            rawLines = rawFile.readlines()
-    except FileNotFoundError:
-        print(f"Raw input file {rawFile} not found.")
-        exit(1)
-
-    # Read the mask file.
-    if args.mask:
-        mask = read_override(args.mask[0])
-    else:
-        mask = []
-
-    if args.talents:
-        talentTime = time.time()
-        # Parse the text
-        s, e = check_section(Talent.START, Talent.END)
-        print(f"Talents start: {s}, end: {e}")
-        rawTalents = rawLines[s:e + 1]
-        talentHunks = []
-        prev = 0
-        for i in range(len(rawTalents)):
-            if rawTalents[i] == "\n":
-                talentHunks.append(rawTalents[prev:i])
-                prev = i + 1
-        # Get the final hunk.
-        talentHunks.append(rawTalents[prev:])
 
+def parse_talents(raw, features, mask, output):
+    """
+    Parse the pilot talents section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from talents import Talent
+    talentTime = time.time()
+    with TIMINGS.phase("talents", "split") as phase:
+        hunks = list(iter_hunks(raw, features))
+        phase.records = len(hunks)
+    with TIMINGS.phase("talents", "parse") as phase:
         talents = []
-        for t in talentHunks:
+        for t in hunks:
             talents.append(Talent(t))
+        phase.records = len(talents)
 
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(TALENTS)
-        # Output results
-        j = []
-        for t in talents:
-            j.append(apply_override(t.to_dict(), mask))
-        add_missing_overrides(j, mask, Talent.PREFIX)
-        print(f"Outputting JSON for {len(talents)} talents to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Talents done in {time.time() - talentTime:.3f} seconds")
-    if args.tags:
-        tagsTime = time.time()
-        # Parse the text
-        s, e = check_section(Tag.START, Tag.END)
-        print(f"Tags start: {s}, end: {e}")
-        rawTags = rawLines[s:e + 1]
+    # Create data output
+    output_records("talents", talents, mask, Talent.PREFIX, output, TALENTS, "talents")
+    print(f"Talents done in {time.time() - talentTime:.3f} seconds")
+
+
+def parse_tags(raw, features, mask, output):
+    """
+    Parse the gear tags section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from tags import Tag
+    tagsTime = time.time()
+    with TIMINGS.phase("tags", "parse") as phase:
         tags = []
         in_ignore = False
-        for rt in rawTags:
+        for i in range(len(raw)):
+            rt = raw[i]
             if not in_ignore and rt.startswith(Tag.FILT_IGN[0]):
                 in_ignore = True
             elif in_ignore and rt.startswith(Tag.FILT_IGN[1]):
                 in_ignore = False
             # Only process lines that have a colon near the start
-            if ": " in rt[:40]:
+            if features.is_set(i, LineFeatures.COLON):
                 tag = Tag(rt.strip())
                 if in_ignore:
                     tag.set_filter(True)
                 tags.append(tag)
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(TAGS)
-        # Output results
-        j = []
-        for t in tags:
-            j.append(apply_override(t.to_dict(), mask))
-        add_missing_overrides(j, mask, Tag.PREFIX)
-        print(f"Outputting JSON for {len(tags)} tags to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Tags done in {time.time() - tagsTime:.3f} seconds")
-    if args.pilot_gear:
-        pgTime = time.time()
-        # Parse the text
-        s, e = check_section(PilotGear.START, PilotGear.END)
-        print(f"Pilot Gear start: {s}, end: {e}")
-        rawPilotGear = rawLines[s:e + 1]
-        gearHunks = []
-        pg = []
-        prev = 0
-        for i in range(len(rawPilotGear)):
-            if rawPilotGear[i] == "\n":
-                gearHunks.append(rawPilotGear[prev:i])
-                prev = i + 1
-        # Catch the last hunk
-        gearHunks.append(rawPilotGear[prev:])
+        phase.records = len(tags)
+    # Create data output
+    output_records("tags", tags, mask, Tag.PREFIX, output, TAGS, "tags")
+    print(f"Tags done in {time.time() - tagsTime:.3f} seconds")
+
 
+def parse_pilot_gear(raw, features, mask, output, expected_damage=False):
+    """
+    Parse the pilot gear section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @param expected_damage: bool: Whether to output each weapon's expected
+    damage.
+    @return: None.
+    """
+    from pilotgear import PilotGear
+    pgTime = time.time()
+    with TIMINGS.phase("pilot_gear", "split") as phase:
+        hunks = list(iter_hunks(raw, features))
+        phase.records = len(hunks)
+    with TIMINGS.phase("pilot_gear", "parse") as phase:
+        pg = []
         # Initialize processing flags
         inWeapons = False
         inArmor = False
         inGear = False
         r_range = False
         r_threat = False
-        for g in gearHunks:
+        for g in hunks:
             # Check whether we're in a new section
             for line in g:
                 if line == PilotGear.WEAPONS_SEC:
@@ -350,69 +339,135 @@ if __name__ == "__main__":
                 # Gear profiles are all of length > 1
                 if len(g) > 1:
                     pg.append(PilotGear(raw_gear=g))
+        phase.records = len(pg)
+    if expected_damage:
+        add_expected_damage("pilot_gear", [g for g in pg if g.type == PilotGear.TYPE_WEAPON])
 
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(PILOT_GEAR)
-        # Output results
-        j = []
-        for p in pg:
-            j.append(apply_override(p.to_dict(), mask))
-        add_missing_overrides(j, mask, PilotGear.PREFIX)
-        print(f"Outputting JSON for {len(pg)} pieces of pilot gear to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Pilot gear done in {time.time() - pgTime:.3f} seconds")
-    if args.skills:
-        skillsTime = time.time()
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(SKILLS)
-        # Parse the text
-        s, e = check_section(Skill.START, Skill.END)
-        print(f"Skills start: {s}, end: {e}")
-        rawSkills = rawLines[s:e + 1]
+    # Create data output
+    output_records("pilot_gear", pg, mask, PilotGear.PREFIX, output, PILOT_GEAR, "pieces of pilot gear")
+    print(f"Pilot gear done in {time.time() - pgTime:.3f} seconds")
+
+
+def parse_skills(raw, features, mask, output):
+    """
+    Parse the pilot skill triggers section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from skills import Skill
+    skillsTime = time.time()
+    with TIMINGS.phase("skills", "split") as phase:
+        capLines = features.lines_with(LineFeatures.CAPS)
+        phase.records = len(capLines)
+    with TIMINGS.phase("skills", "parse") as phase:
         skills = []
-        for i in range(len(rawSkills)):
-            if rawSkills[i].isupper():
-                skills.append(Skill(rawSkills[i:i + 2]))
-        j = []
-        for s in skills:
-            j.append(apply_override(s.to_dict(), mask))
-        add_missing_overrides(j, mask, Skill.PREFIX)
-        print(f"Outputting JSON for {len(skills)} skills to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Skills done in {time.time() - skillsTime:.3f} seconds")
-    if args.frames:
-        framesTime = time.time()
-        # Parse the text
-        s, e = check_section(Frame.START, Frame.END)
-        print(f"Frames start: {s}, end: {e}")
-        rawFrames = rawLines[s:e + 1]
-        frameHunks = []
-        frames = []
-        manufacturers = []
-        coreBonuses = []
-        systems = []
-        weapons = []
-        mods = []
-        prev = 0
-        for i in range(len(rawFrames)):
-            if rawFrames[i] == "\n":
-                frameHunks.append(rawFrames[prev:i])
-                prev = i + 1
-        # Catch the last hunk
-        frameHunks.append(rawFrames[prev:])
-        # Strip out any empty hunks
-        while [] in frameHunks:
-            frameHunks.remove([])
-        source = "NONE"
-        gmsSec = "NONE"
-        gmsWepDesc = ["" for i in range(4)]
-        for hunk in frameHunks:
+        for i in capLines:
+            skills.append(Skill(raw[i:i + 2]))
+        phase.records = len(skills)
+    output_records("skills", skills, mask, Skill.PREFIX, output, SKILLS, "skills")
+    print(f"Skills done in {time.time() - skillsTime:.3f} seconds")
+
+
+def parse_frames_item(task, captured=False):
+    """
+    Parse one item of the frames section, in a worker process or in order.
+    @param task: (HunkKind, [str], str, object): The kind of item, its lines,
+    the source it's from, and its context: the GMS weapon descriptions for a
+    GMS weapon, the GMS subsection for a GMS system, or None. Licensed gear is
+    parsed without its license level, which is set afterwards.
+    @param captured: bool: Whether to capture everything printed while parsing,
+    to be printed by the caller in order.
+    @return: (object, str): The parsed item, and what was printed if captured.
+    """
+    from corebonus import CoreBonus
+    from frame import Frame
+    from hunkclassifier import HunkKind
+    from licensegear import Mod, System, Weapon
+    from manufacturer import Manufacturer
+    kind, lines, source, context = task
+    with contextlib.redirect_stdout(io.StringIO()) if captured else contextlib.nullcontext() as log:
+        if kind == HunkKind.FRAME:
+            item = Frame(raw_text=lines)
+        elif kind == HunkKind.MANUFACTURER:
+            item = Manufacturer(raw=lines)
+        elif kind == HunkKind.CORE_BONUS:
+            item = CoreBonus(raw=(source, lines))
+        elif kind == HunkKind.GMS_WEAPON:
+            item = Weapon(raw_text=lines, gms=context, src=source)
+        elif kind == HunkKind.WEAPON:
+            item = Weapon(raw_text=lines, gms=None, src=source)
+        elif kind == HunkKind.MOD:
+            item = Mod(raw_text=lines, src=source)
+        else:
+            item = System(raw_text=lines, src=source)
+            if context == "Flight":
+                item.type = "Flight System"
+    return item, log.getvalue() if captured else ""
+
+
+def parse_frames(raw, features, mask, output, expected_damage=False, workers=1, outputs=None,
+                 license_index=None):
+    """
+    Parse the frames, manufacturers, core bonuses, and licensed mech gear section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @param expected_damage: bool: Whether to output each weapon's expected
+    damage.
+    @param workers: int: Number of worker processes to parse the section's
+    items with. Items are parsed in order in this process if 1.
+    @param outputs: [str]: The outputs to write (e.g. "weapons"). Only the
+    items they need are parsed. Defaults to all of the section's outputs.
+    @param license_index: LicenseIndex: If given, every parsed frame's license
+    table is added to it, to look up which license and level unlock any piece
+    of gear in the catalog.
+    @return: None.
+    """
+    from corebonus import CoreBonus
+    from frame import Frame
+    from hunkclassifier import HunkKind, classify_hunk
+    from licensegear import Mod, System, Weapon
+    from manufacturer import Manufacturer
+    framesTime = time.time()
+    frames = []
+    manufacturers = []
+    coreBonuses = []
+    systems = []
+    weapons = []
+    mods = []
+    source = "NONE"
+    gmsSec = "NONE"
+    gmsWepDesc = ["" for i in range(4)]
+    with TIMINGS.phase("frames", "split") as phase:
+        hunks = list(iter_hunks(raw, features))
+        phase.records = len(hunks)
+    if outputs is None:
+        outputs = OUTPUT_GRAPH.outputs("frames")
+    needed = OUTPUT_GRAPH.requires(outputs)
+    # The output each kind of hunk is parsed for.
+    kindOutputs = dict([
+        (HunkKind.FRAME, "frames"),
+        (HunkKind.MANUFACTURER, "manufacturers"),
+        (HunkKind.CORE_BONUS, "core_bonuses"),
+        (HunkKind.GMS_WEAPON, "weapons"),
+        (HunkKind.WEAPON, "weapons"),
+        (HunkKind.MOD, "mods"),
+        (HunkKind.SYSTEM, "systems")
+    ])
+    with TIMINGS.phase("frames", "classify") as phase:
+        # First label each item with the context it's parsed in, which only
+        #   changes at frame, manufacturer and GMS header hunks.
+        tasks = []
+        # Index in frames of the frame each item's license comes from, if any.
+        owners = []
+        frameCount = 0
+        for hunk in hunks:
             # Keep track of which subsection we're in.
             if hunk[0] == System.GMS_SYSTEMS:
                 gmsSec = "Systems"
@@ -444,13 +499,18 @@ if __name__ == "__main__":
                         gmsWepDesc[3] = hunk[1].strip() + "<br>" + line.strip()
 
             # Determine what kind of data this hunk is for.
+            kind = classify_hunk(hunk, gmsSec)
             #   Frames
-            if Frame.CORE_STATS in hunk:
-                frames.append(Frame(raw_text=hunk))
-                source = frames[-1].source
+            if kind == HunkKind.FRAME:
+                tasks.append((kind, hunk, source, None))
+                owners.append(None)
+                frameCount += 1
+                # The frame's source is its first line.
+                source = hunk[0].strip().upper()
             #   Manufacturers
-            elif hunk[0] in Manufacturer.TITLES:
-                manufacturers.append(Manufacturer(raw=hunk))
+            elif kind == HunkKind.MANUFACTURER:
+                tasks.append((kind, hunk, source, None))
+                owners.append(None)
                 if hunk[0] == Manufacturer.GMS[0]:
                     source = Manufacturer.GMS[2]
                     gmsSec = "NONE"
@@ -467,236 +527,216 @@ if __name__ == "__main__":
                     source = Manufacturer.HA[2]
                     gmsSec = "NONE"
             #   Core Bonuses
-            elif CoreBonus.CORE in hunk[0]:
+            elif kind == HunkKind.CORE_BONUS:
                 txt = hunk[1:]
-                cap_lines = []
                 # Each core bonus is named by a line that is all upper case.
                 # Find those lines and split the text into separate core bonuses
                 # accordingly.
-                for i in range(len(txt)):
-                    if txt[i].isupper():
-                        cap_lines.append(i)
+                cap_lines = [i - hunk.start - 1 for i in
+                             features.lines_with(LineFeatures.CAPS, hunk.start + 1, hunk.end)]
                 for i in range(len(cap_lines)):
                     if i < len(cap_lines)-1:
-                        raw = (source, txt[cap_lines[i]:cap_lines[i+1]])
+                        tasks.append((kind, txt[cap_lines[i]:cap_lines[i+1]], source, None))
                     else:
-                        raw = (source, txt[cap_lines[i]:])
-                    coreBonuses.append(CoreBonus(raw=raw))
+                        tasks.append((kind, txt[cap_lines[i]:], source, None))
+                    owners.append(None)
             #   Weapons
-            elif gmsSec == "Weapons":
+            elif kind == HunkKind.GMS_WEAPON:
                 # All GMS weapon entries are 5 lines
                 if 3 <= len(hunk) <= 4:
-                    weapons.append(Weapon(raw_text=hunk, gms=gmsWepDesc, src=source))
-            elif weapon_check(hunk):
-                weapons.append(Weapon(raw_text=hunk, gms=None, src=source,
-                                      lic_table=frames[-1].license))
+                    tasks.append((kind, hunk, source, list(gmsWepDesc)))
+                    owners.append(None)
             #   Weapon Mods
-            elif mod_check(hunk):
-                mods.append(Mod(raw_text=hunk, src=source,
-                                lic_table=frames[-1].license))
+            elif kind == HunkKind.WEAPON or kind == HunkKind.MOD:
+                tasks.append((kind, hunk, source, None))
+                owners.append(frameCount - 1)
             #   Systems
-            elif (gmsSec == "Systems"
-                  or gmsSec == "Flight"):
-                if len(hunk) >= 3 and hunk[0] != System.GMS_FLIGHT:
-                    systems.append(System(raw_text=hunk, src=source))
-                    if gmsSec == "Flight":
-                        systems[-1].type = "Flight System"
-            elif sys_check(hunk):
-                systems.append(System(raw_text=hunk, src=source,
-                                      lic_table=frames[-1].license))
-
-        # Create data output for frames
-        if len(frames) > 0:
-            if args.stdout:
-                dOut = DataOutput("stdout")
-            else:
-                dOut = DataOutput(FRAMES)
-            j = []
-            for frame in frames:
-                j.append(apply_override(frame.to_dict(), mask))
-            add_missing_overrides(j, mask, Frame.PREFIX)
-            print(f"Outputting JSON for {len(frames)} frames to {dOut.target}")
-            dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        # Create data output for manufactuers
-        if len(manufacturers) > 0:
-            if args.stdout:
-                dOut = DataOutput("stdout")
-            else:
-                dOut = DataOutput(MANUFACTURERS)
-            j = []
-            for mfr in manufacturers:
-                j.append(apply_override(mfr.to_dict(), mask))
-            add_missing_overrides(j, mask, Manufacturer.PREFIX)
-            print(f"Outputting JSON for {len(manufacturers)} manufacturers to {dOut.target}")
-            dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        # Create data output for core bonuses
-        if len(coreBonuses) > 0:
-            if args.stdout:
-                dOut = DataOutput("stdout")
-            else:
-                dOut = DataOutput(CORE_BONUSES)
-            j = []
-            for cb in coreBonuses:
-                j.append(apply_override(cb.to_dict(), mask))
-            add_missing_overrides(j, mask, CoreBonus.PREFIX)
-            print(f"Outputting JSON for {len(coreBonuses)} core bonuses to {dOut.target}")
-            dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        # Create data output for weapons
-        if len(weapons) > 0:
-            if args.stdout:
-                dOut = DataOutput("stdout")
-            else:
-                dOut = DataOutput(WEAPONS)
-            j = []
-            for weapon in weapons:
-                j.append(apply_override(weapon.to_dict(), mask))
-                # Debugging printout
-                # print("\n" + str(weapon))
-            add_missing_overrides(j, mask, Weapon.PREFIX)
-            print(f"Outputting JSON for {len(weapons)} weapons to {dOut.target}")
-            dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        # Create data output for mods
-        if len(mods) > 0:
-            if args.stdout:
-                dOut = DataOutput("stdout")
-            else:
-                dOut = DataOutput(MODS)
-            j = []
-            for mod in mods:
-                j.append(apply_override(mod.to_dict(), mask))
-                # Debugging printout
-                # print("\n" + str(mod))
-            add_missing_overrides(j, mask, Mod.PREFIX)
-            print(f"Outputting JSON for {len(mods)} mods to {dOut.target}")
-            dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        # Create data output for systems
-        if len(systems) > 0:
-            if args.stdout:
-                dOut = DataOutput("stdout")
-            else:
-                dOut = DataOutput(SYSTEMS)
-            j = []
-            for system in systems:
-                j.append(apply_override(system.to_dict(), mask))
-                # Debugging printout
-                # print("\n" + str(system))
-            add_missing_overrides(j, mask, System.PREFIX)
-            print(f"Outputting JSON for {len(systems)} systems to {dOut.target}")
-            dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-            print(f"Frames done in {time.time() - framesTime:.3f} seconds")
-    if args.statuses:
-        statusTime = time.time()
-        # Parse the text
-        s, e = check_section(Status.START, Status.END)
-        print(f"Statuses start: {s}, end: {e}")
-        rawStatuses = rawLines[s:e + 1]
-        statuses = []
-        # Each new status starts with a line in upper case.
-        cap_lines = []
+            elif kind == HunkKind.SYSTEM:
+                if gmsSec == "Systems" or gmsSec == "Flight":
+                    if len(hunk) >= 3 and hunk[0] != System.GMS_FLIGHT:
+                        tasks.append((kind, hunk, source, gmsSec))
+                        owners.append(None)
+                else:
+                    tasks.append((kind, hunk, source, None))
+                    owners.append(frameCount - 1)
+
+        # Skip items which no requested output needs.
+        keep = [i for i in range(len(tasks)) if kindOutputs[tasks[i][0]] in needed]
+        if len(keep) < len(tasks):
+            tasks = [tasks[i] for i in keep]
+            owners = [owners[i] for i in keep]
+        phase.records = len(hunks)
+    with TIMINGS.phase("frames", "parse") as phase:
+        # Then parse the items, in parallel if there are workers, and put them
+        #   back together in order.
+        parsed = dict([
+            (HunkKind.FRAME, frames),
+            (HunkKind.MANUFACTURER, manufacturers),
+            (HunkKind.CORE_BONUS, coreBonuses),
+            (HunkKind.GMS_WEAPON, weapons),
+            (HunkKind.WEAPON, weapons),
+            (HunkKind.MOD, mods),
+            (HunkKind.SYSTEM, systems)
+        ])
+        pool = None
+        if workers > 1 and len(tasks) > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+            chunk = max(1, len(tasks) // (workers * 4))
+            results = pool.map(parse_frames_item, tasks, [True] * len(tasks), chunksize=chunk)
+        else:
+            results = map(parse_frames_item, tasks, [False] * len(tasks))
+        try:
+            for task, owner, (item, log) in zip(tasks, owners, results):
+                print(log, end="")
+                # Licensed gear gets its level from the frame it belongs to.
+                if owner is not None and frames[owner].license_index is not None:
+                    item.set_level(frames[owner].license_index)
+                parsed[task[0]].append(item)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        phase.records = len(frames) + len(manufacturers) + len(coreBonuses) + len(weapons) + len(mods) + len(systems)
+    if license_index is not None:
+        for frame in frames:
+            if frame.license_index is not None:
+                license_index.update(frame.license_index)
+    if expected_damage:
+        add_expected_damage("frames", weapons)
+
+    # Create data output for frames
+    if len(frames) > 0 and "frames" in outputs:
+        output_records("frames", frames, mask, Frame.PREFIX, output, FRAMES, "frames")
+
+    # Create data output for manufactuers
+    if len(manufacturers) > 0 and "manufacturers" in outputs:
+        output_records("frames", manufacturers, mask, Manufacturer.PREFIX, output, MANUFACTURERS, "manufacturers")
+
+    # Create data output for core bonuses
+    if len(coreBonuses) > 0 and "core_bonuses" in outputs:
+        output_records("frames", coreBonuses, mask, CoreBonus.PREFIX, output, CORE_BONUSES, "core bonuses")
+
+    # Create data output for weapons
+    if len(weapons) > 0 and "weapons" in outputs:
+        output_records("frames", weapons, mask, Weapon.PREFIX, output, WEAPONS, "weapons")
+
+    # Create data output for mods
+    if len(mods) > 0 and "mods" in outputs:
+        output_records("frames", mods, mask, Mod.PREFIX, output, MODS, "mods")
+
+    # Create data output for systems
+    if len(systems) > 0 and "systems" in outputs:
+        output_records("frames", systems, mask, System.PREFIX, output, SYSTEMS, "systems")
+    print(f"Frames done in {time.time() - framesTime:.3f} seconds")
+
+
+def parse_statuses(raw, features, mask, output):
+    """
+    Parse the statuses and conditions section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from statuses import Status
+    statusTime = time.time()
+    statuses = []
+    # Each new status starts with a line in upper case.
+    with TIMINGS.phase("statuses", "split") as phase:
+        cap_lines = features.lines_with(LineFeatures.CAPS)
+        phase.records = len(cap_lines)
+    with TIMINGS.phase("statuses", "parse") as phase:
         stat = False
-        for i in range(len(rawStatuses)):
-            if rawStatuses[i].isupper():
-                cap_lines.append(i)
         for i in range(len(cap_lines)):
             idx = cap_lines[i]
-            if rawStatuses[idx] == Status.START[0]:
+            if raw[idx] == Status.START[0]:
                 pass
-            elif rawStatuses[idx] == Status.STATUS:
+            elif raw[idx] == Status.STATUS:
                 stat = True
-            elif rawStatuses[idx] == Status.CONDITION:
+            elif raw[idx] == Status.CONDITION:
                 stat = False
             else:
                 if i < len(cap_lines) - 1:
-                    statuses.append(Status(rawStatuses[idx:cap_lines[i+1]], stat))
+                    statuses.append(Status(raw[idx:cap_lines[i+1]], stat))
                 else:
-                    statuses.append(Status(rawStatuses[idx:], stat))
+                    statuses.append(Status(raw[idx:], stat))
+        phase.records = len(statuses)
 
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(STATUSES)
-        j = []
-        for s in statuses:
-            j.append(apply_override(s.to_dict(), mask))
-        print(f"Outputting JSON for {len(statuses)} statuses to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Statuses done in {time.time() - statusTime:.3f} seconds")
-    if args.glossary:
-        glossaryTime = time.time()
-        # Parse the text
-        s, e = check_section(GlossaryItem.START, GlossaryItem.END)
-        print(f"Glossary start: {s}, end: {e}")
-        rawGlossary = rawLines[s:e + 1]
+    # Create data output
+    output_records("statuses", statuses, mask, None, output, STATUSES, "statuses")
+    print(f"Statuses done in {time.time() - statusTime:.3f} seconds")
+
+
+def parse_glossary(raw, features, mask, output):
+    """
+    Parse the combat glossary section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from glossary import GlossaryItem
+    glossaryTime = time.time()
+    with TIMINGS.phase("glossary", "parse") as phase:
         glossary = []
-        for line in rawGlossary[1:]:
+        for line in raw[1:]:
             glossary.append(GlossaryItem(line))
+        phase.records = len(glossary)
+
+    # Create data output
+    output_records("glossary", glossary, mask, None, output, GLOSSARY, "glossary items")
+    print(f"Glossary done in {time.time() - glossaryTime:.3f} seconds")
 
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(GLOSSARY)
-        j = []
-        for g in glossary:
-            j.append(apply_override(g.to_dict(), mask))
-        print(f"Outputting JSON for {len(glossary)} glossary items to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Glossary done in {time.time() - glossaryTime:.3f} seconds")
-    if args.backgrounds:
-        bgTime = time.time()
-        # Parse the text
-        s, e = check_section(Background.START, Background.END)
-        print(f"Backgrounds start: {s}, end: {e}")
-        rawBackgrounds = rawLines[s:e + 1]
-        bgHunks = []
-        prev = 0
-        for i in range(len(rawBackgrounds)):
-            if rawBackgrounds[i] == "\n":
-                bgHunks.append(rawBackgrounds[prev:i])
-                prev = i + 1
-        # Get the final hunk.
-        bgHunks.append(rawBackgrounds[prev:])
 
+def parse_backgrounds(raw, features, mask, output):
+    """
+    Parse the pilot backgrounds section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from backgrounds import Background
+    bgTime = time.time()
+    with TIMINGS.phase("backgrounds", "split") as phase:
+        hunks = list(iter_hunks(raw, features))
+        phase.records = len(hunks)
+    with TIMINGS.phase("backgrounds", "parse") as phase:
         backgrounds = []
-        for b in bgHunks:
+        for b in hunks:
             backgrounds.append(Background(b))
+        phase.records = len(backgrounds)
 
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(BACKGROUNDS)
-        j = []
-        for b in backgrounds:
-            j.append(apply_override(b.to_dict(), mask))
-        add_missing_overrides(j, mask, Background.PREFIX)
-        print(f"Outputting JSON for {len(backgrounds)} pilot backgrounds to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Backgrounds done in {time.time() - bgTime:.3f} seconds")
-    if args.actions:
-        actTime = time.time()
-        # Find the text
-        s, e = check_section(Action.START, Action.END)
-        print(f"Actions start: {s}, end: {e}")
-        rawActions = rawLines[s:e + 1]
-        actHunks = []
-        prev = 0
-        for i in range(len(rawActions)):
-            if rawActions[i] == "\n":
-                actHunks.append(rawActions[prev:i])
-                prev = i + 1
-        # Get the final hunk.
-        actHunks.append(rawActions[prev:])
-
-        # Parse the text
+    # Create data output
+    output_records("backgrounds", backgrounds, mask, Background.PREFIX, output, BACKGROUNDS, "pilot backgrounds")
+    print(f"Backgrounds done in {time.time() - bgTime:.3f} seconds")
+
+
+def parse_actions(raw, features, mask, output):
+    """
+    Parse the player actions section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from actions import Action
+    actTime = time.time()
+    # Parse the text
+    with TIMINGS.phase("actions", "split") as phase:
+        hunks = list(iter_hunks(raw, features))
+        phase.records = len(hunks)
+    with TIMINGS.phase("actions", "parse") as phase:
         actions = []
-        for a in actHunks:
+        for a in hunks:
             a_type = ""
             pilot = False
             if a[0].strip() == Action.DOWNTIME[0]:
@@ -718,13 +758,8 @@ if __name__ == "__main__":
                 a_type = Action.PILOT[1]
                 pilot = True
 
-            cap_lines = []
-            for i in range(len(a)):
-                if i == 0:
-                    continue
-                line = a[i]
-                if line.strip().isupper():
-                    cap_lines.append(i)
+            cap_lines = [i - a.start for i in
+                         features.lines_with(LineFeatures.CAPS, a.start + 1, a.end)]
             for i in range(len(cap_lines)):
                 idx = cap_lines[i]
                 a_raw = []
@@ -756,79 +791,75 @@ if __name__ == "__main__":
                         actions[-1].id += "_full"
                 else:
                     actions.append(Action(a_raw, a_type, pilot))
+        phase.records = len(actions)
 
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(ACTIONS)
-        j = []
-        actions.sort()
-        for a in actions:
-            j.append(apply_override(a.to_dict(), mask))
-        add_missing_overrides(j, mask, Action.PREFIX, front=True)
-        print(f"Outputting JSON for {len(actions)} player actions to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Actions done in {time.time() - actTime:.3f} seconds")
-    if args.reserves:
-        reservesTime = time.time()
-        # Create data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(RESERVES)
-        # Parse the text
-        s, e = check_section(Reserve.START, Reserve.END)
-        print(f"Reserves start: {s}, end: {e}")
-        rawReserves = rawLines[s:e + 1]
+    # Create data output
+    actions.sort()
+    output_records("actions", actions, mask, Action.PREFIX, output, ACTIONS, "player actions", front=True)
+    print(f"Actions done in {time.time() - actTime:.3f} seconds")
+
+
+def parse_reserves(raw, features, mask, output):
+    """
+    Parse the reserves section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: None.
+    """
+    from reserves import Reserve
+    reservesTime = time.time()
+    with TIMINGS.phase("reserves", "parse") as phase:
         r_type = ""
         reserves = []
-        for i in range(len(rawReserves)):
-            line = rawReserves[i]
-            if line.isupper():
+        for i in range(len(raw)):
+            line = raw[i]
+            if features.is_set(i, LineFeatures.CAPS):
                 r_type = line[:line.find(" ")].strip().title()
             else:
                 first, delim, rest = line.partition(" ")
                 if first[:first.find("-")].isdecimal():
-                    reserves.append(Reserve(rawReserves[i:i+2], r_type))
-        j = []
-        for r in reserves:
-            j.append(apply_override(r.to_dict(), mask))
-        add_missing_overrides(j, mask, Reserve.PREFIX, front=True)
-        print(f"Outputting JSON for {len(reserves)} reserves to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-        print(f"Reserves done in {time.time() - reservesTime:.3f} seconds")
-    ##################################
-    #          NPC DATA              #
-    ##################################
-    if args.NPCClasses:
-        npcTime = time.time()
-        # Find the relevant text
-        npc_s, npc_e = check_section(NPCClass.START, NPCClass.END)
-        print(f"NPC classes start: {npc_s}, end: {npc_e}")
-        temp_s, temp_e = check_section(NPCTemplate.START, NPCTemplate.END)
-        print(f"NPC templates start: {temp_s}, end: {temp_e}")
-        rawNPCs = rawLines[min(npc_s, temp_s):max(npc_e, temp_e) + 1]
-        npcHunks = []
-        npcc = []
-        npct = []
-        npcf = []
-        prev = 0
-        for i in range(len(rawNPCs)):
-            if rawNPCs[i] == "\n":
-                npcHunks.append(rawNPCs[prev:i])
-                prev = i + 1
-        # Catch the last hunk
-        npcHunks.append(rawNPCs[prev:])
-        # Strip out any empty hunks
-        while [] in npcHunks:
-            npcHunks.remove([])
-
-        # Parse the text
+                    reserves.append(Reserve(raw[i:i+2], r_type))
+        phase.records = len(reserves)
+    output_records("reserves", reserves, mask, Reserve.PREFIX, output, RESERVES, "reserves", front=True)
+    print(f"Reserves done in {time.time() - reservesTime:.3f} seconds")
+
+
+##################################
+#          NPC DATA              #
+##################################
+def parse_npcs(raw, features, mask, output, outputs=None):
+    """
+    Parse the NPC classes, templates, and features section and write its JSON output.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @param outputs: [str]: The outputs to write (e.g. "npc_features").
+    Defaults to all of the section's outputs. Classes, templates and features
+    are always all parsed, since each needs the others.
+    @return: None.
+    """
+    from npcclass import NPCClass
+    from npcfeatures import NPCFeature, new_npc_feature
+    from npctemplates import NPCTemplate
+    npcTime = time.time()
+    npcc = []
+    npct = []
+    npcf = []
+
+    # Parse the text
+    with TIMINGS.phase("NPCClasses", "split") as phase:
+        hunks = list(iter_hunks(raw, features))
+        phase.records = len(hunks)
+    with TIMINGS.phase("NPCClasses", "parse") as phase:
         base_sys = False
         opt_sys = False
         templates = False
-        for hunk in npcHunks:
+        for hunk in hunks:
             done = False
             # Look through the hunk to see what kind it is
             for line in hunk:
@@ -869,42 +900,403 @@ if __name__ == "__main__":
                     else:
                         feat.set_origin("Template", npct[-1].name, False)
                         npct[-1].opt_feat.append(feat.id)
+        phase.records = len(npcc) + len(npct) + len(npcf)
 
-        # Create NPC Classes data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(NPC_CLASSES)
-        j = []
-        for n in npcc:
-            j.append(apply_override(n.to_dict(), mask))
-        add_missing_overrides(j, mask, NPCClass.PREFIX, front=True)
-        print(f"Outputting JSON for {len(npcc)} NPC classes to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        # Create NPC Templates data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
-        else:
-            dOut = DataOutput(NPC_TEMPLATES)
-        j = []
-        for n in npct:
-            j.append(apply_override(n.to_dict(), mask))
-        add_missing_overrides(j, mask, NPCTemplate.PREFIX, front=True)
-        print(f"Outputting JSON for {len(npct)} NPC templates to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        # Create NPC Features data output
-        if args.stdout:
-            dOut = DataOutput("stdout")
+    if outputs is None:
+        outputs = OUTPUT_GRAPH.outputs("NPCClasses")
+
+    # Create NPC Classes data output
+    if "npc_classes" in outputs:
+        output_records("NPCClasses", npcc, mask, NPCClass.PREFIX, output, NPC_CLASSES, "NPC classes", front=True)
+
+    # Create NPC Templates data output
+    if "npc_templates" in outputs:
+        output_records("NPCClasses", npct, mask, NPCTemplate.PREFIX, output, NPC_TEMPLATES, "NPC templates", front=True)
+
+    # Create NPC Features data output
+    if "npc_features" in outputs:
+        output_records("NPCClasses", npcf, mask, NPCFeature.PREFIX, output, NPC_FEATURES, "NPC features", front=True)
+
+    print(f"NPCs done in {time.time() - npcTime:.3f} seconds")
+
+
+# Each section: (command line flag, parse function, [(section class, log label)],
+#   id prefixes of the mask entries the section can use, output files).
+# Classes and prefixes are given by name and only imported once the section is
+#   requested - see load().
+SECTIONS = [
+    ("talents", parse_talents, [("talents.Talent", "Talents")], ["talents.Talent.PREFIX"],
+     [TALENTS]),
+    ("tags", parse_tags, [("tags.Tag", "Tags")], ["tags.Tag.PREFIX"], [TAGS]),
+    ("pilot_gear", parse_pilot_gear, [("pilotgear.PilotGear", "Pilot Gear")],
+     ["pilotgear.PilotGear.PREFIX"], [PILOT_GEAR]),
+    ("skills", parse_skills, [("skills.Skill", "Skills")], ["skills.Skill.PREFIX"], [SKILLS]),
+    ("frames", parse_frames, [("frame.Frame", "Frames")],
+     ["frame.Frame.PREFIX", "corebonus.CoreBonus.PREFIX", "licensegear.Weapon.PREFIX",
+      "licensegear.Mod.PREFIX", "licensegear.System.PREFIX", "manufacturer.Manufacturer.PREFIX",
+      "manufacturer.Manufacturer.IDS"],
+     [FRAMES, MANUFACTURERS, CORE_BONUSES, WEAPONS, MODS, SYSTEMS]),
+    ("statuses", parse_statuses, [("statuses.Status", "Statuses")], [], [STATUSES]),
+    ("glossary", parse_glossary, [("glossary.GlossaryItem", "Glossary")], [], [GLOSSARY]),
+    ("backgrounds", parse_backgrounds, [("backgrounds.Background", "Backgrounds")],
+     ["backgrounds.Background.PREFIX"], [BACKGROUNDS]),
+    ("actions", parse_actions, [("actions.Action", "Actions")], ["actions.Action.PREFIX"],
+     [ACTIONS]),
+    ("reserves", parse_reserves, [("reserves.Reserve", "Reserves")],
+     ["reserves.Reserve.PREFIX"], [RESERVES]),
+    ("NPCClasses", parse_npcs,
+     [("npcclass.NPCClass", "NPC classes"), ("npctemplates.NPCTemplate", "NPC templates")],
+     ["npcclass.NPCClass.PREFIX", "npctemplates.NPCTemplate.PREFIX",
+      "npcfeatures.NPCFeature.PREFIX"],
+     [NPC_CLASSES, NPC_TEMPLATES, NPC_FEATURES]),
+]
+
+# Maps output -> [str]: the other outputs of its section which have to be
+#   parsed to produce it.
+OUTPUT_DEPENDENCIES = dict([
+    # Licensed gear gets its license and level from its frame's license table.
+    ("weapons", ["frames"]),
+    ("mods", ["frames"]),
+    ("systems", ["frames"]),
+    # Classes and templates list the ids of their features. Features get their
+    #   origin from the class or template before them, which are always
+    #   parsed with them.
+    ("npc_classes", ["npc_features"]),
+    ("npc_templates", ["npc_features"])
+])
+
+# Each output is named after its file, e.g. "core_bonuses".
+OUTPUT_GRAPH = OutputGraph([(output_name(target), sec[0], OUTPUT_DEPENDENCIES.get(output_name(target), []))
+                            for sec in SECTIONS for target in sec[4]])
+
+# Sections which can output the expected damage of their weapons.
+DAMAGE_SECTIONS = ["pilot_gear", "frames"]
+# Sections which can parse their items with worker processes.
+PARALLEL_SECTIONS = ["frames"]
+
+
+def load(name):
+    """
+    Import a parser class or class attribute by name.
+    @param name: str: "module.Class" or "module.Class.ATTRIBUTE".
+    @return: The named class or attribute.
+    """
+    parts = name.split(".")
+    result = importlib.import_module(parts[0])
+    for part in parts[1:]:
+        result = getattr(result, part)
+    return result
+
+
+def section_prefixes(names):
+    """
+    Load the mask id prefixes a section uses.
+    @param names: [str]: Names of PREFIX attributes, or of lists of prefixes.
+    @return: (str): The prefixes.
+    """
+    prefixes = []
+    for name in names:
+        prefix = load(name)
+        if isinstance(prefix, str):
+            prefixes.append(prefix)
         else:
-            dOut = DataOutput(NPC_FEATURES)
-        j = []
-        for n in npcf:
-            j.append(apply_override(n.to_dict(), mask))
-        add_missing_overrides(j, mask, NPCFeature.PREFIX, front=True)
-        print(f"Outputting JSON for {len(npcf)} NPC features to {dOut.target}")
-        dOut.write(json.dumps(j, indent=2, separators=(',', ': '), ensure_ascii=False))
-
-        print(f"NPCs done in {time.time() - npcTime:.3f} seconds")
+            prefixes.extend(prefix)
+    return tuple(prefixes)
+
+
+def locate_section(index, classes):
+    """
+    Find the lines a section spans.
+    @param index: SectionIndex: Index of the raw text.
+    @param classes: [(class, str)]: The section's classes and log labels.
+    @return: ([str], int, int): Notes to log about the section, and the start
+    and end (inclusive) of the lines it spans.
+    """
+    notes = []
+    start = end = None
+    for cls, label in classes:
+        s, e = index.span(cls)
+        notes.append(f"{label} start: {s}, end: {e}")
+        start = s if start is None else min(start, s)
+        end = e if end is None else max(end, e)
+    return notes, start, end
+
+
+def select_sections(flags, outputs=None):
+    """
+    Work out which sections to run.
+    @param flags: [str]: Sections to run in full, as in SECTIONS.
+    @param outputs: [str]: Outputs to produce (e.g. "weapons"). Their
+    sections only do the work those outputs need.
+    @return: [(tuple, [str])]: The SECTIONS entry of each section to run, in
+    order, with the outputs it should write, or None to write all of them.
+    @raise ValueError: If a section or output is unknown.
+    """
+    known = [sec[0] for sec in SECTIONS]
+    selected = dict()
+    for flag in flags:
+        if flag not in known:
+            raise ValueError(f"Unknown section {flag}")
+        selected[flag] = None
+    if outputs is not None:
+        for flag, names in OUTPUT_GRAPH.plan(outputs).items():
+            if flag not in selected:
+                # Asking for all of a section's outputs runs it in full.
+                selected[flag] = None if names == OUTPUT_GRAPH.outputs(flag) else names
+    return [(sec, selected[sec[0]]) for sec in SECTIONS if sec[0] in selected]
+
+
+def run_section(func, notes, raw, features, mask, output):
+    """
+    Parse a section and write its output.
+    @param func: function: The section's parse function.
+    @param notes: [str]: Lines to log before parsing.
+    @param raw: [str]: The lines of the section.
+    @param features: LineFeatures: The features of the section's lines.
+    @param mask: OverrideMask: The mask entries relevant to this section.
+    @param output: class: Creates the DataOutput for an output file (DataOutput,
+    StdoutOutput, or RecordOutput).
+    @return: [str]: The output files the section wrote.
+    """
+    for note in notes:
+        print(note)
+    written = []
+
+    def tracked(target):
+        written.append(target)
+        return output(target)
+
+    func(raw, features, mask, tracked)
+    return written
+
+
+def run_section_captured(func, notes, raw, features, mask, output, timed=False):
+    """
+    Parse a section in a worker process, capturing everything it prints so
+    the parent can report sections in a stable order.
+    Parameters are the same as run_section, plus:
+    @param timed: bool: Whether to record timings for the section's phases.
+    @return: (str, [Phase], [str]): The section's printed output, its timed
+    phases, and the output files it wrote.
+    """
+    TIMINGS.enabled = timed
+    TIMINGS.clear()
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        written = run_section(func, notes, raw, features, mask, output)
+    return log.getvalue(), TIMINGS.phases, written
+
+
+def parse(raw, sections=None, mask=None, log=None, expected_damage=False, outputs=None,
+          license_index=None):
+    """
+    Parse rulebook text without writing any files. Only the parser modules for
+    the requested sections are imported.
+    @param raw: str or [str]: The raw text, or its lines.
+    @param sections: [str]: Names of the sections to parse, as in SECTIONS
+    (e.g. "talents", "frames", "NPCClasses"). Defaults to all of them, unless
+    outputs are given.
+    @param mask: OverrideMask or [dict]: Override data to apply, if any.
+    @param log: file: Where to write the parsers' progress messages. They are
+    discarded by default.
+    @param expected_damage: bool: Whether to output the expected damage of
+    each mech and pilot weapon.
+    @param outputs: [str]: Names of outputs to produce as well (e.g.
+    "weapons", "npc_features"). Only the parsing they need is done.
+    @param license_index: LicenseIndex: If given and frames are parsed, it's
+    filled from every frame's license table, for looking up which license and
+    level unlock any piece of gear.
+    @return: dict: Maps output name (e.g. "talents", "core_bonuses",
+    "npc_features") -> [dict]: the parsed records.
+    """
+    if isinstance(raw, str):
+        raw = RawSource.split_lines(raw)
+    if sections is None:
+        sections = [sec[0] for sec in SECTIONS] if outputs is None else []
+    selected = select_sections(sections, outputs)
+    if mask is None:
+        mask = OverrideMask()
+    elif not isinstance(mask, OverrideMask):
+        mask = OverrideMask(mask)
+
+    requested = [(flag, func, [(load(cls), label) for cls, label in classes],
+                  section_prefixes(prefixes), names)
+                 for (flag, func, classes, prefixes, targets), names in selected]
+    index = SectionIndex(raw, [cls for sec in requested for cls, label in sec[2]])
+    records = dict()
+    output = functools.partial(RecordOutput, records)
+    if log is None:
+        log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        for flag, func, classes, prefixes, names in requested:
+            if expected_damage and flag in DAMAGE_SECTIONS:
+                func = functools.partial(func, expected_damage=True)
+            if names is not None:
+                func = functools.partial(func, outputs=names)
+            if license_index is not None and flag == "frames":
+                func = functools.partial(func, license_index=license_index)
+            notes, start, end = locate_section(index, classes)
+            sec_raw = raw[start:end + 1]
+            run_section(func, notes, sec_raw, LineFeatures(sec_raw), mask.select(prefixes), output)
+    return records
+
+
+if __name__ == "__main__":
+    startTime = time.time()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stdout", help="Output to stdout instead of file.")
+    parser.add_argument("-t", "--talents", action="store_true",
+                        help="Generate talents JSON.")
+    parser.add_argument("-T", "--tags", action="store_true",
+                        help="Generate tag data JSON.")
+    parser.add_argument("-p", "--pilot-gear", action="store_true",
+                        help="Generate pilot gear JSON.")
+    parser.add_argument("-s", "--skills", action="store_true",
+                        help="Generate skill trigger JSON.")
+    parser.add_argument("-f", "--frames", action="store_true",
+                        help="Generate frame, core bonus, and mech gear JSON.")
+    parser.add_argument("-S", "--statuses", action="store_true",
+                        help="Generate status/condition JSON.")
+    parser.add_argument("-g", "--glossary", action="store_true",
+                        help="Generate combat glossary JSON.")
+    parser.add_argument("-b", "--backgrounds", action="store_true",
+                        help="Generate pilot background JSON.")
+    parser.add_argument("-a", "--actions", action="store_true",
+                        help="Generate player action JSON.")
+    parser.add_argument("-r", "--reserves", action="store_true",
+                        help="Generate reserves JSON.")
+    parser.add_argument("-N", "--NPCClasses", action="store_true",
+                        help="Generate NPC class JSON.")
+    parser.add_argument("--sections", metavar="OUTPUTS",
+                        help="Comma separated outputs to generate, e.g. weapons,npc_features. "
+                             "Only the parsing they need is done.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes to parse sections with. The frames "
+                             "section also parses its items with this many workers.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Parse and write every section, even if it hasn't changed.")
+    parser.add_argument("-m", "--mask", nargs=1,
+                        help="Specify a mask file with overrides for specific id's.")
+    parser.add_argument("--expected-damage", action="store_true",
+                        help="Output the expected damage of each mech and pilot weapon.")
+    parser.add_argument("--timings-json", metavar="FILE",
+                        help="Write the time spent in each phase of each section to FILE.")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write a Chrome trace of the parsing phases to FILE.")
+    parser.add_argument("raw", help="raw text input file")
+    args = parser.parse_args()
+    TIMINGS.enabled = args.timings_json is not None or args.trace is not None
+
+    # Map the raw file - lines are only decoded for the sections that are parsed.
+    try:
+        with TIMINGS.phase("run", "read") as phase:
+            rawSource = RawSource(args.raw)
+            phase.records = len(rawSource)
+            phase.bytes = len(rawSource.data)
+    except FileNotFoundError:
+        print(f"Raw input file {args.raw} not found.")
+        exit(1)
+
+    # Work out which sections to run, and what each needs to output.
+    try:
+        selected = select_sections([sec[0] for sec in SECTIONS if getattr(args, sec[0])],
+                                   args.sections.split(",") if args.sections else None)
+    except ValueError as e:
+        print(e)
+        exit(1)
+
+    # Locate all of the requested sections in one pass over the raw text.
+    requested = [(flag, func, [(load(cls), label) for cls, label in classes],
+                  section_prefixes(prefixes), outputs, names)
+                 for (flag, func, classes, prefixes, outputs), names in selected]
+    with TIMINGS.phase("run", "locate") as phase:
+        sections = SectionIndex(rawSource, [cls for sec in requested for cls, label in sec[2]])
+        phase.records = len(rawSource)
+
+    # Read the mask file.
+    if args.mask:
+        mask = read_override(args.mask[0])
+    else:
+        mask = OverrideMask()
+
+    # Skip sections whose inputs haven't changed since their output was written.
+    use_cache = not args.stdout and not args.rebuild
+    cache = BuildCache(CACHE)
+    code_hash = BuildCache.source_hash(os.path.dirname(os.path.abspath(__file__)))
+
+    output = StdoutOutput if args.stdout else DataOutput
+    jobs = []
+    keys = []
+    for flag, func, classes, prefixes, outputs, names in requested:
+        notes, start, end = locate_section(sections, classes)
+        sec_mask = mask.select(prefixes)
+        options = dict()
+        if args.expected_damage and flag in DAMAGE_SECTIONS:
+            options["expected_damage"] = True
+            func = functools.partial(func, **options)
+        key = BuildCache.section_key(rawSource.span(start, end + 1), sec_mask, code_hash, options)
+        if names is not None:
+            # Only some outputs are written. They're kept if the whole section is
+            #   up to date; otherwise the section's other outputs are stale once
+            #   these are written, so its key is cleared.
+            func = functools.partial(func, outputs=names)
+            outputs = [target for target in outputs if output_name(target) in names]
+        if use_cache and cache.is_current(flag, key, outputs):
+            for note in notes:
+                print(note)
+            print(f"Section {flag} unchanged since last build, keeping existing output.")
+            continue
+        with TIMINGS.phase(flag, "decode") as phase:
+            raw = rawSource.lines(start, end + 1)
+            features = LineFeatures(raw)
+            phase.records = len(raw)
+            phase.bytes = rawSource.offsets[min(end + 1, len(rawSource))] - rawSource.offsets[start]
+        jobs.append((func, notes, raw, features, sec_mask, output))
+        keys.append((flag, key if names is None else None))
+    rawSource.close()
+
+    if args.jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        # Sections which parse their items with a pool of their own run in this
+        #   process, so pools aren't nested, and the jobs are split between their
+        #   pool and the pool the other sections run in. Workers don't change
+        #   the output, so they aren't part of the key.
+        local = [i for i in range(len(jobs)) if keys[i][0] in PARALLEL_SECTIONS]
+        pooled = [i for i in range(len(jobs)) if keys[i][0] not in PARALLEL_SECTIONS]
+        sectionWorkers = args.jobs
+        if len(local) > 0:
+            sectionWorkers = args.jobs // 2 if len(pooled) > 0 else 0
+        pool = ProcessPoolExecutor(max_workers=sectionWorkers) if len(pooled) > 0 else None
+        try:
+            # Submit the biggest sections first so the slowest one starts right
+            #   away, but report the results in the usual order.
+            futures = dict()
+            for i in sorted(pooled, key=lambda k: len(jobs[k][2]), reverse=True):
+                futures[i] = pool.submit(run_section_captured, *jobs[i], TIMINGS.enabled)
+            logs = dict()
+            for i in local:
+                func = functools.partial(jobs[i][0], workers=args.jobs - sectionWorkers)
+                with contextlib.redirect_stdout(io.StringIO()) as log:
+                    written = run_section(func, *jobs[i][1:])
+                logs[i] = (log.getvalue(), written)
+            for i in range(len(jobs)):
+                if i in logs:
+                    log, written = logs[i]
+                else:
+                    log, phases, written = futures[i].result()
+                    TIMINGS.extend(phases)
+                print(log, end="")
+                cache.update(*keys[i], written)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    else:
+        for i in range(len(jobs)):
+            written = run_section(*jobs[i])
+            cache.update(*keys[i], written)
+    if not args.stdout and len(jobs) > 0:
+        cache.save()
+    if args.timings_json:
+        TIMINGS.write_json(args.timings_json)
+    if args.trace:
+        TIMINGS.write_trace(args.trace)
     print(f"Total run time: {time.time() - startTime:.3f} seconds")
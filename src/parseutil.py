@@ -1,7 +1,21 @@
 #!/bin/python3
 # -*- utf-8 -*-
 
+import re
+from collections.abc import Sequence
+from functools import lru_cache
 
+
+# [#]d#[+#], where the number of dice defaults to 1 and the bonus to 0.
+DIE_ROLL = re.compile(r"(\d*)d(\d+)(?:\+(\d*))?")
+
+# Characters which are replaced or removed when generating an ID.
+ID_TABLE = str.maketrans({" ": "_", "/": "_", "-": "_",
+                          "'": None, "’": None, "“": None, "”": None, "\"": None,
+                          "(": None, ")": None, ",": None, "!": None})
+
+
+@lru_cache(maxsize=4096)
 def gen_id(prefix, name):
     """
     Generate item ID from its name.
@@ -9,10 +23,17 @@ def gen_id(prefix, name):
     @param name: str: The item's name.
     @return: str: The generated id. Should only contain lowercase alphanumeric and _.
     """
-    return prefix + name.strip().lower().replace(" ", "_").replace("/", "_").\
-        replace("-", "_").replace("-", "_").replace("'", "").replace("’", "").\
-        replace("“", "").replace("”", "").replace("\"", "").replace("(", "").\
-        replace(")", "").replace(",", "").replace("!", "")
+    return prefix + name.strip().lower().translate(ID_TABLE)
+
+
+def gen_ids(prefix, names):
+    """
+    Generate IDs for several items of the same data type.
+    @param prefix: str: The prefix for this data type.
+    @param names: [str]: The items' names.
+    @return: [str]: The generated ids, in the same order as names.
+    """
+    return [gen_id(prefix, name) for name in names]
 
 
 def combine_lines(lines, check_horus=False):
@@ -24,23 +45,24 @@ def combine_lines(lines, check_horus=False):
     square brackets) and wrap it in appropriate tags.
     @return: str: The combined lines.
     """
-    result = ""
+    parts = []
     for line in lines:
         line = line.strip()
-        if line.startswith("- "):
-            line = line.replace("- ", "<li>", 1)
-        elif line.startswith("– "):
-            line = line.replace("– ", "<li>", 1)
+        if line.startswith("- ") or line.startswith("– "):
+            line = "<li>" + line[2:]
 
         if check_horus and line.startswith("[") and line.endswith("]"):
             line = "<span class='ra-quiet'>"+line+"</span>"
 
-        if result == "":
-            result = line.strip()
-        else:
-            result += "<br>"+line.strip()
-    result = result.replace("<br><li>", "<li>").strip()
-    return result
+        # Leading empty lines are dropped, and list items don't need a <br>
+        #   before them.
+        if len(parts) > 0 and not line.startswith("<li>"):
+            parts.append("<br>")
+        if "<br><li>" in line:
+            line = line.replace("<br><li>", "<li>")
+        if len(parts) > 0 or line != "":
+            parts.append(line)
+    return "".join(parts)
 
 
 def is_duplicate_tag(tag, tags):
@@ -59,6 +81,71 @@ def is_duplicate_tag(tag, tags):
     return False
 
 
+class TagSet:
+    """
+    Ordered collection of tag dicts, indexed by their "id" values. Adding a
+    tag whose id is already present does nothing, so building a tag list
+    doesn't need to scan the tags added so far.
+    """
+
+    __slots__ = ("by_id",)
+
+    def __init__(self, tags=()):
+        """
+        @param tags: [dict]: Initial tags, in order.
+        """
+        # Maps id -> tag dict, in insertion order.
+        self.by_id = dict()
+        for tag in tags:
+            self.add(tag)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __contains__(self, tag_id):
+        return tag_id in self.by_id
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+    def add(self, tag):
+        """
+        Add a tag, unless one with the same id is already in the set.
+        @param tag: dict: The new tag. Must have an "id" key.
+        @return: bool: True if the tag was added.
+        """
+        if tag["id"] in self.by_id:
+            return False
+        self.by_id[tag["id"]] = tag
+        return True
+
+    def remove(self, tag_id):
+        """
+        Remove a tag, if it is in the set.
+        @param tag_id: str: The id of the tag to remove.
+        @return: None.
+        """
+        self.by_id.pop(tag_id, None)
+
+    def remove_all(self, tag_ids):
+        """
+        Remove several tags from the set.
+        @param tag_ids: [str]: The ids of the tags to remove.
+        @return: None.
+        """
+        for tag_id in tag_ids:
+            self.by_id.pop(tag_id, None)
+
+    def to_list(self):
+        """
+        @return: [dict]: The tags, in the order they were added.
+        """
+        return list(self.by_id.values())
+
+
 def is_die_roll(check_str):
     """
     Evaluate whether a string represents a die roll.
@@ -66,32 +153,83 @@ def is_die_roll(check_str):
     @return: True if the string represents a roll. Format is [#]d#[+#], where each
        instance of # is an integer. Portions within [] are optional.
     """
-    d_ind = -1
-    p_ind = -1
-    if "d" in check_str:
-        d_ind = check_str.find("d")
-    if "+" in check_str:
-        p_ind = check_str.find("+")
-
-    num_dice = ""
-    size_dice = ""
-    flat_bonus = ""
-    if d_ind == 0:
-        num_dice = "1"
-        if p_ind > 0:
-            size_dice = check_str[d_ind+1:p_ind]
-            flat_bonus = check_str[p_ind+1:]
-        else:
-            size_dice = check_str[d_ind+1:]
-    elif d_ind > 0:
-        num_dice = check_str[:d_ind]
-        if p_ind > 0:
-            size_dice = check_str[d_ind+1:p_ind]
-            flat_bonus = check_str[p_ind+1:]
-        else:
-            size_dice = check_str[d_ind+1:]
-    if flat_bonus == "":
-        flat_bonus = "0"
-
-    return num_dice.isdecimal() and size_dice.isdecimal() and flat_bonus.isdecimal()
+    return DIE_ROLL.fullmatch(check_str) is not None
+
+
+class Hunk(Sequence):
+    """
+    A read-only view of a run of lines within a larger list of lines, so that
+    splitting a section into hunks doesn't copy any lines. Indexing reads from
+    the shared list; slicing returns a new list, just as it would for a list.
+    """
+
+    __slots__ = ("lines", "start", "end")
+
+    def __init__(self, lines, start, end):
+        """
+        @param lines: [str]: The shared lines.
+        @param start: int: Index of the first line of the hunk.
+        @param end: int: Index one past the last line of the hunk.
+        """
+        self.lines = lines
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
 
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            first, stop, step = idx.indices(self.end - self.start)
+            if step == 1:
+                return self.lines[self.start + first:self.start + max(first, stop)]
+            return [self.lines[self.start + i] for i in range(first, stop, step)]
+        if idx < 0:
+            idx += self.end - self.start
+        if idx < 0 or idx >= self.end - self.start:
+            raise IndexError("hunk index out of range")
+        return self.lines[self.start + idx]
+
+    def __iter__(self):
+        return map(self.lines.__getitem__, range(self.start, self.end))
+
+    def __contains__(self, value):
+        for line in self:
+            if line == value:
+                return True
+        return False
+
+    def __repr__(self):
+        return repr(self[:])
+
+    def __reduce__(self):
+        # Only pickle the hunk's own lines, not the whole shared list.
+        return (Hunk, (self[:], 0, self.end - self.start))
+
+
+def iter_hunks(lines, features=None):
+    """
+    Split lines into hunks, which are separated by empty lines.
+    @param lines: [str]: The lines to split.
+    @param features: LineFeatures: The features of lines. If given, the empty
+    lines are looked up in it rather than searched for.
+    @return: generator of Hunk: A view of each non-empty hunk, in order.
+    """
+    prev = 0
+    if features is not None:
+        for i in features.lines_with(features.BLANK):
+            if i > prev:
+                yield Hunk(lines, prev, i)
+            prev = i + 1
+    else:
+        while True:
+            try:
+                i = lines.index("\n", prev)
+            except ValueError:
+                break
+            if i > prev:
+                yield Hunk(lines, prev, i)
+            prev = i + 1
+    # Get the final hunk.
+    if len(lines) > prev:
+        yield Hunk(lines, prev, len(lines))
@@ -2,9 +2,10 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class PilotGear:
+class PilotGear(Record):
     """
     Class for pilot gear data.
     NECESSARY PREP-WORK:
@@ -12,6 +13,21 @@ class PilotGear:
     * Heavy Signature weapon - put range/damage on same line as tags
     """
 
+    __slots__ = ("id", "type", "name", "description", "tags", "range", "damage", "effect",
+                 "expected_damage", "speed", "armor", "edef", "evasion", "hp_bonus", "uses")
+    FIELDS = ["id", "name", "type", "description", "tags",
+              ("range", "obj.range", "obj.type == cls.TYPE_WEAPON"),
+              ("damage", "obj.damage", "obj.type == cls.TYPE_WEAPON"),
+              ("effect", "obj.effect", "obj.type == cls.TYPE_WEAPON and obj.effect != \"\""),
+              ("expected_damage", "obj.expected_damage",
+               "obj.type == cls.TYPE_WEAPON and obj.expected_damage is not None"),
+              ("hp_bonus", "obj.hp_bonus", "obj.type == cls.TYPE_ARMOR"),
+              ("armor", "obj.armor", "obj.type == cls.TYPE_ARMOR"),
+              ("evasion", "obj.evasion", "obj.type == cls.TYPE_ARMOR"),
+              ("edef", "obj.edef", "obj.type == cls.TYPE_ARMOR"),
+              ("speed", "obj.speed", "obj.type == cls.TYPE_ARMOR"),
+              ("uses", "obj.uses", "obj.type == cls.TYPE_GEAR and obj.uses > 0")]
+
     START = ["Pilot Gear\n",
              "On missions, pilots can take one set",
              "The names and descriptions given for pilot gear"]
@@ -47,6 +63,8 @@ class PilotGear:
             self.range = []
             self.damage = []
             self.effect = ""
+            # Only set when expected damage is requested.
+            self.expected_damage = None
             self.parse_weapon(raw_weapon)
         elif raw_armor is not None:
             self.speed = 0
@@ -245,25 +263,3 @@ class PilotGear:
                     d = {"id": "tg_"+(t.strip().lower().replace(" ", "_"))}
                 if not is_duplicate_tag(d, self.tags) and d["id"] != "tg_":
                     self.tags.append(d)
-
-    def to_dict(self):
-        d = {"id": self.id,
-             "name": self.name,
-             "type": self.type,
-             "description": self.description,
-             "tags": self.tags}
-        if self.type == PilotGear.TYPE_WEAPON:
-            d["range"] = self.range
-            d["damage"] = self.damage
-            if self.effect != "":
-                d["effect"] = self.effect
-        elif self.type == PilotGear.TYPE_ARMOR:
-            d["hp_bonus"] = self.hp_bonus
-            d["armor"] = self.armor
-            d["evasion"] = self.evasion
-            d["edef"] = self.edef
-            d["speed"] = self.speed
-        elif self.type == PilotGear.TYPE_GEAR:
-            if self.uses > 0:
-                d["uses"] = self.uses
-        return d
\ No newline at end of file
@@ -0,0 +1,102 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+import mmap
+import os
+from array import array
+
+
+class RawSource:
+    """
+    The raw rulebook text, memory-mapped rather than read into a list of
+    strings. Only a table of line start offsets is kept in memory; lines are
+    decoded from UTF-8 when a section asks for them. Indexing a RawSource gives
+    the undecoded bytes of a line, which is enough to locate the sections.
+    Windows line endings are read as "\n", as when reading the file in text
+    mode.
+    """
+
+    def __init__(self, file_name):
+        """
+        Map the file and find where each line starts.
+        @param file_name: str: The raw text file.
+        """
+        self.file = open(file_name, 'rb')
+        if os.fstat(self.file.fileno()).st_size > 0:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # Empty files can't be mapped.
+            self.data = b""
+
+        # Offset of the start of each line, followed by the end of the text.
+        self.offsets = array('Q', [0])
+        pos = self.data.find(b"\n")
+        while pos != -1:
+            self.offsets.append(pos + 1)
+            pos = self.data.find(b"\n", pos + 1)
+        if self.offsets[-1] != len(self.data):
+            self.offsets.append(len(self.data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        """
+        @param idx: int: The line number.
+        @return: bytes: The line, including its newline.
+        """
+        if idx < 0:
+            idx += len(self)
+        line = self.data[self.offsets[idx]:self.offsets[idx + 1]]
+        if line.endswith(b"\r\n"):
+            line = line[:-2] + b"\n"
+        return line
+
+    def close(self):
+        """
+        Unmap and close the file.
+        @return: None.
+        """
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def span(self, start, end):
+        """
+        Get the undecoded text of some lines.
+        @param start: int: The first line.
+        @param end: int: The line to stop at (exclusive).
+        @return: bytes: The text of the lines.
+        """
+        end = min(end, len(self))
+        return self.data[self.offsets[start]:self.offsets[end]]
+
+    def lines(self, start, end):
+        """
+        Decode some lines.
+        @param start: int: The first line.
+        @param end: int: The line to stop at (exclusive).
+        @return: [str]: The lines, each including its newline.
+        """
+        return RawSource.split_lines(self.span(start, end).decode("utf-8"))
+
+    @staticmethod
+    def split_lines(text):
+        """
+        Split text into lines the way reading it in text mode would.
+        @param text: str: The text.
+        @return: [str]: The lines, each including its newline.
+        """
+        if "\r\n" in text:
+            text = text.replace("\r\n", "\n")
+        parts = text.split("\n")
+        result = [p + "\n" for p in parts[:-1]]
+        if parts[-1] != "":
+            result.append(parts[-1])
+        return result
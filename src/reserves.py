@@ -2,13 +2,17 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Reserve:
+class Reserve(Record):
     """
     Class for reserves.
     """
 
+    __slots__ = ("id", "name", "type", "label", "description")
+    FIELDS = ["id", "name", "type", "label", "description"]
+
     START = ["RESOURCES\n",
              "1-2 Access",
              "A keycard, invite, bribes or insider"]
@@ -49,10 +53,3 @@ class Reserve:
         self.name = raw[0][raw[0].find(" "):].strip()
         self.id = gen_id(Reserve.PREFIX, self.name)
         self.description = raw[1].strip()
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "type": self.type,
-                "label": self.label,
-                "description": self.description}
@@ -0,0 +1,95 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+
+class SectionIndex:
+    """
+    Locates the spans of rulebook sections in a single pass over the raw text.
+    Each section is described by a class with START and END attributes, which
+    are lists of line prefixes marking its first and last lines (see Talent,
+    Tag, Frame, NPCClass, etc.). The first line of every delimiter is matched
+    through a shared prefix trie, so each raw line is only examined once no
+    matter how many sections are requested. The raw lines can be str or
+    undecoded UTF-8 bytes (see RawSource).
+    """
+
+    # Trie node key holding the delimiters whose first line ends at that node.
+    MATCH = ""
+
+    def __init__(self, raw_lines, sections):
+        """
+        Build the index.
+        @param raw_lines: [str] or [bytes]: The raw text, one line per entry.
+        @param sections: [class]: The section classes to locate. Each must have
+        START and END lists of line prefixes.
+        """
+        # Maps section class -> (start, end) line indexes in raw_lines.
+        self.spans = dict()
+
+        # Each delimiter is a list of line prefixes. Track the first line on
+        # which each one was found.
+        delims = []
+        for section in sections:
+            delims.append(section.START)
+            delims.append(section.END)
+        found = [-1 for d in delims]
+        if len(raw_lines) > 0 and isinstance(raw_lines[0], bytes):
+            delims = [[prefix.encode("utf-8") for prefix in d] for d in delims]
+
+        trie = dict()
+        for i in range(len(delims)):
+            node = trie
+            for ch in delims[i][0]:
+                node = node.setdefault(ch, dict())
+            node.setdefault(SectionIndex.MATCH, []).append(i)
+
+        remaining = len(delims)
+        for i in range(len(raw_lines)):
+            node = trie
+            for ch in raw_lines[i]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                for d in node.get(SectionIndex.MATCH, ()):
+                    if found[d] < 0 and self._matches(raw_lines, i, delims[d]):
+                        found[d] = i
+                        remaining -= 1
+            if remaining == 0:
+                break
+
+        for i in range(len(sections)):
+            start = found[2 * i]
+            end = found[2 * i + 1]
+            if end >= 0:
+                # The section ends on the last line of its END delimiter.
+                end += len(sections[i].END) - 1
+            self.spans[sections[i]] = (start, end)
+
+    @staticmethod
+    def _matches(raw_lines, idx, delim):
+        """
+        Check whether the lines following idx match the rest of a delimiter.
+        @param raw_lines: [str] or [bytes]: The raw text.
+        @param idx: int: The line matching the first prefix of delim.
+        @param delim: [str] or [bytes]: The delimiter's line prefixes.
+        @return: bool: True if every line of the delimiter matches.
+        """
+        if idx + len(delim) > len(raw_lines):
+            return False
+        for j in range(1, len(delim)):
+            if not raw_lines[idx + j].startswith(delim[j]):
+                return False
+        return True
+
+    def span(self, section):
+        """
+        Get the lines a section spans.
+        @param section: class: The section class, as passed to the initializer.
+        @return: (int, int): the start and end indexes within the raw text, or
+        None if either delimiter was not found.
+        """
+        start_idx, end_idx = self.spans[section]
+        if start_idx < 0 or end_idx < 0:
+            print(f"There was a problem! s{start_idx}, e{end_idx}")
+            return None
+        return start_idx, end_idx
@@ -0,0 +1,144 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+from json.encoder import encode_basestring
+
+from dataoutput import DataOutput
+
+ENCODER = DataOutput.ENCODER
+
+
+def extend_fields(fields, extra):
+    """
+    Combine a record class's field spec with more fields, for a subclass.
+    @param fields: [str or tuple]: The base class's FIELDS.
+    @param extra: [str or tuple]: The subclass's fields. One with the same key
+    as a base field replaces it, in the base field's place.
+    @return: [str or tuple]: The combined spec.
+    """
+    result = list(fields)
+    keys = [field_key(f) for f in result]
+    for f in extra:
+        if field_key(f) in keys:
+            result[keys.index(field_key(f))] = f
+        else:
+            result.append(f)
+            keys.append(field_key(f))
+    return result
+
+
+def field_key(field):
+    """
+    @param field: str or tuple: A field spec entry.
+    @return: str: The key the field is output under.
+    """
+    return field if isinstance(field, str) else field[0]
+
+
+def encode_value(val, indent="\n    "):
+    """
+    Encode a field value the way DataOutput would when it is nested inside a
+    record in the output list.
+    @param val: The value.
+    @param indent: str: Newline and indentation of the value's record fields.
+    @return: str: The JSON for the value.
+    """
+    if val.__class__ is str:
+        return encode_basestring(val)
+    # Strings are escaped, so the only newlines are the encoder's own.
+    return ENCODER.encode(val).replace("\n", indent)
+
+
+def encode_record(record):
+    """
+    Encode a record dict as an element of the output list.
+    @param record: dict: The record.
+    @return: str: The JSON for the record.
+    """
+    return ENCODER.encode(record).replace("\n", "\n  ")
+
+
+class RecordSerializer:
+    """
+    Functions generated from a record class's field spec to output its
+    records, either as a dict or straight to JSON text. The JSON is exactly
+    what DataOutput writes for the dict, without building the dict.
+
+    A class's spec is its FIELDS list, in output order. Each entry is either
+    the name of an attribute, output under the same key, or a tuple of
+    (key, value expression[, condition expression]), where the expressions
+    are Python in terms of the record "obj" and its class "cls". A field
+    with a condition is only output when the condition is true.
+    """
+
+    # Maps record class -> RecordSerializer.
+    CACHE = dict()
+
+    def __init__(self, cls):
+        """
+        Generate the functions for a record class.
+        @param cls: class: The class. Must have a FIELDS spec.
+        """
+        self.cls = cls
+        name = cls.__name__
+        to_dict = [f"def to_dict_{name}(obj):", "    d = dict()"]
+        to_json = [f"def to_json_{name}(obj):", "    items = []"]
+        for field in cls.FIELDS:
+            if isinstance(field, str):
+                key, value, condition = field, f"obj.{field}", None
+            else:
+                key, value, condition = (tuple(field) + (None,))[:3]
+            ind = "    "
+            if condition is not None:
+                to_dict.append(f"    if {condition}:")
+                to_json.append(f"    if {condition}:")
+                ind = "        "
+            to_dict.append(f"{ind}d[{key!r}] = {value}")
+            prefix = encode_basestring(key) + ": "
+            to_json.append(f"{ind}items.append({prefix!r} + encode_value({value}))")
+        to_dict.append("    return d")
+        to_json.append('    if len(items) == 0:')
+        to_json.append('        return "{}"')
+        to_json.append('    return "{\\n    " + ",\\n    ".join(items) + "\\n  }"')
+
+        namespace = dict([("cls", cls), ("encode_value", encode_value)])
+        exec("\n".join(to_dict + [""] + to_json), namespace)
+        self.to_dict = namespace[f"to_dict_{name}"]
+        self.to_json = namespace[f"to_json_{name}"]
+
+    @staticmethod
+    def of(cls):
+        """
+        Get the serializer for a record class, generating it the first time.
+        @param cls: class: The class.
+        @return: RecordSerializer: The class's serializer.
+        """
+        s = RecordSerializer.CACHE.get(cls)
+        if s is None:
+            s = RecordSerializer(cls)
+            RecordSerializer.CACHE[cls] = s
+        return s
+
+
+class Record:
+    """
+    Base for parsed entity classes, which output their FIELDS through a
+    generated RecordSerializer.
+    """
+
+    __slots__ = ()
+
+    FIELDS = []
+
+    def to_dict(self):
+        """
+        @return: dict: The record's output data.
+        """
+        return RecordSerializer.of(type(self)).to_dict(self)
+
+    def to_json(self):
+        """
+        @return: str: The record's output data encoded as JSON, as an element
+        of the output list.
+        """
+        return RecordSerializer.of(type(self)).to_json(self)
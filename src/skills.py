@@ -2,13 +2,17 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Skill:
+class Skill(Record):
     """
     Class for pilot skill data.
     """
 
+    __slots__ = ("id", "name", "description", "detail", "family")
+    FIELDS = ["id", "name", "description", "detail", "family"]
+
     START = ["ACT UNSEEN OR UNHEARD\n",
              "Get somewhere or do something without",
              "APPLY FISTS TO FACES\n"]
@@ -53,10 +57,3 @@ class Skill:
 
     def set_desc(self, new_desc):
         self.description = new_desc
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "description": self.description,
-                "detail": self.detail,
-                "family": self.family}
@@ -0,0 +1,142 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+import re
+from collections import namedtuple
+
+# A word of a damage stat: a plain number, tier values (e.g. "4/6/8"), or a
+#   die roll (e.g. "2d6+4"). Anything else is a damage type or filler.
+STAT_WORD = re.compile(r"(?P<number>\d+)|(?P<tiers>[+-]?\d+(?:/[+-]?\d+)+)|(?P<dice>\d*d\d+(?:\+\d*)?)")
+
+
+class RangeStat(namedtuple("RangeStat", ["type", "val", "override"])):
+    """A range stat, e.g. [Range 10] or [Blast 1]."""
+
+    __slots__ = ()
+
+    def to_dict(self):
+        """
+        @return: dict: The stat as output in weapon data.
+        """
+        if self.override:
+            return dict([("override", True), ("type", self.type), ("val", self.val)])
+        return dict([("type", self.type), ("val", self.val)])
+
+
+class DamageStat(namedtuple("DamageStat", ["type", "val", "override"])):
+    """
+    A damage stat, e.g. [2d6+4 explosive damage]. The val is an int, a die
+    roll string, or a tuple of per-tier ints.
+    """
+
+    __slots__ = ()
+
+    def to_dict(self, val_key="val"):
+        """
+        @param val_key: str: The key to output the damage value under.
+        @return: dict: The stat as output in weapon data.
+        """
+        val = list(self.val) if isinstance(self.val, tuple) else self.val
+        if self.override:
+            return dict([("override", True), (val_key, val)])
+        return dict([("type", self.type), (val_key, val)])
+
+
+StatLine = namedtuple("StatLine", ["ranges", "damage"])
+
+
+class StatGrammar:
+    """
+    Grammar for the bracketed range and damage specs of a weapon, like
+    "[Range 10][Blast 1][2d6+4 explosive damage + 2 heat]". Each spec line is
+    only parsed once; the result is cached by the line's text.
+    A bracket starting with a range keyword is a range stat. A range with
+    " or " in it (e.g. "[range 5 or threat 3]") also gives the stat after the
+    last " or ", after all other brackets. Any other bracket containing a
+    damage keyword is a damage stat, which is a series of values each followed
+    by a damage type; a damage stat with " or " in it is "variable".
+    """
+
+    def __init__(self, ranges, damage, ignore_case=False, tiered=False, unknown=True):
+        """
+        @param ranges: [str]: Lower case keywords for range stats.
+        @param damage: [str]: Lower case keywords for damage stats.
+        @param ignore_case: bool: Whether keywords can be in any case.
+        @param tiered: bool: Whether damage values are per tier. Each value is
+        then a tuple of ints, e.g. "4/6/8" or "5" (the same for each tier), and
+        die rolls are not values.
+        @param unknown: bool: Whether to read "???" (Mimic Gun) as an
+        overridden range or damage.
+        """
+        self.ranges = frozenset(ranges)
+        self.damage = re.compile("|".join(re.escape(k) for k in damage),
+                                 re.IGNORECASE if ignore_case else 0)
+        self.ignore_case = ignore_case
+        self.tiered = tiered
+        self.unknown = unknown
+        # Maps stripped line -> StatLine.
+        self.cache = dict()
+
+    def parse(self, line):
+        """
+        Parse a spec line.
+        @param line: str: The line of specs.
+        @return: StatLine: The range stats and damage stats on the line, in
+        order. Shared between all lines with the same text, so don't modify it.
+        """
+        line = line.strip()
+        stats = self.cache.get(line)
+        if stats is None:
+            stats = self._parse(line)
+            self.cache[line] = stats
+        return stats
+
+    def _parse(self, line):
+        ranges = []
+        damage = []
+        parts = line.split("]")
+        if "" in parts:
+            parts.remove("")
+        # Parts are appended to while parsing, for "or" ranges.
+        i = 0
+        while i < len(parts):
+            part = parts[i].replace("[", "").strip()
+            i += 1
+            words = [w.strip() for w in part.split(" ")]
+            keyword = words[0].lower() if self.ignore_case else words[0]
+
+            if self.unknown and "???" in words:
+                if "range" in words:
+                    ranges.append(RangeStat("Range", "???", True))
+                elif "damage" in words:
+                    damage.append(DamageStat(None, "??? kinetic", True))
+            elif keyword in self.ranges:
+                if " or " in part:
+                    parts.append(part[part.rfind(" or ")+4:])
+                val = words[1]
+                if val.isdecimal():
+                    val = int(val)
+                ranges.append(RangeStat(words[0].title(), val, False))
+            elif self.damage.search(part) is not None:
+                self._parse_damage(part, words, damage)
+        return StatLine(tuple(ranges), tuple(damage))
+
+    def _parse_damage(self, part, words, damage):
+        d_type = "variable" if " or " in part else ""
+        val = None
+        for word in words:
+            m = STAT_WORD.fullmatch(word)
+            kind = m.lastgroup if m is not None else None
+            if kind == "number":
+                val = (int(word),) * 3 if self.tiered else int(word)
+            elif kind == "tiers" and self.tiered:
+                val = tuple(int(v) for v in word.split("/"))
+            elif kind == "dice" and not self.tiered:
+                val = word
+            elif word != "damage" and word != "+":
+                d_type = word
+
+            if val is not None and d_type != "":
+                damage.append(DamageStat(d_type, val, False))
+                d_type = ""
+                val = None
@@ -2,15 +2,19 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Status:
+class Status(Record):
     """
     Class for status/condition data.
     NECESSARY PREP WORK:
     * None yet.
     """
 
+    __slots__ = ("name", "type", "effect")
+    FIELDS = ["name", "type", ("effects", "obj.effect")]
+
     START = ["STATUSES AND CONDITIONS\n",
              "During combat, characters often inflict and receive",
              "Actions, talents, systems, and other effects can all inflict"]
@@ -41,8 +45,3 @@ class Status:
         #     if line.strip().startswith("- "):
         #         line = line.strip().replace("- ", "<li>", 1).strip()
         #     self.effect.append(line.strip())
-
-    def to_dict(self):
-        return {"name": self.name,
-                "type": self.type,
-                "effects": self.effect}
@@ -0,0 +1,568 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+"""Generates synthetic rulebook text in the layout the section parsers expect."""
+
+import argparse
+
+
+def _more_lines(size, text):
+    """
+    @param size: int: The entry size.
+    @param text: str: The sentence to repeat.
+    @return: [str]: size - 1 extra description lines.
+    """
+    return [f"{text} ({i}).\n" for i in range(1, size)]
+
+
+def _more_tags(size):
+    """
+    @param size: int: The entry size.
+    @return: str: size - 1 extra, distinct tags to append to a tag line.
+    """
+    return "".join(f", Variant{i}" for i in range(1, size))
+
+
+def _talents(scale, size=1):
+    lines = ["Ace\n",
+             "Every pilot brags about their abilities; aces back it up.\n",
+             "Whether you’re a talented rookie or a grizzled veteran, you fly well.\n",
+             "Rank 1: Acrobatics\n",
+             "While you're flying, you get the following benefits:\n",
+             "- You make all Agility checks and saves with +1 Accuracy.\n",
+             "- Gain +1 Evasion.\n",
+             "Rank 2: Afterburners\n",
+             "When you Boost while flying, you may move an additional 1d6 spaces.\n",
+             "Rank 3: Supersonic\n",
+             "1/round, when you make a standard move, you may fly instead.\n",
+             "\n"]
+    for n in range(5 * scale):
+        lines += [f"Bonded {n}\n",
+                  "You have a partner, a relationship that cannot be broken.\n",
+                  "Rank 1: I'm Your Huckleberry\n",
+                  "When you take this talent, choose another pilot.\n"]
+        lines += _more_lines(size, "Your bond grows stronger")
+        lines += ["- You get +1 Accuracy on checks to help them.\n",
+                  "Rank 2: Sundance\n",
+                  "Gain the following reaction:\n",
+                  "Reaction, 1/round\n",
+                  "Rank 3: Cover Me!\n",
+                  "If your Bondmate is within range 5, you may take hits for them.\n",
+                  "\n"]
+    lines += ["Walking Armory\n",
+              "You carry an extraordinary amount of ammunition.\n",
+              "Rank 1: Armament\n",
+              "Choose one of the following ammo types:\n",
+              "Rank 2: Pouches\n",
+              "Choose two more ammo types:\n",
+              "- Thumper (1 charge): The attack gains Knockback 1.\n",
+              "- Sabot (2 charges): The attack gains AP and Reliable 2.\n",
+              "Rank 3: Efficiency\n",
+              "If you perform a critical hit using ammo, regain 1 charge.\n",
+              "\n"]
+    return lines
+
+
+def _tags(scale, size=1):
+    lines = ["Harm type\n",
+             "Weapons deal one of four types of damage – kinetic, energy, explosive, burn.\n",
+             "Burn X: On a hit, this weapon deals X burn to its target.\n",
+             "Heat X (Self): When this weapon or system is used, take X heat.\n",
+             "Patterns\n",
+             "Arcing: This weapon can be fired over obstacles.\n"]
+    for n in range(10 * scale):
+        lines.append(f"Pattern {n}: This pattern is ignored by filters.\n")
+    lines.append("Accurate: Attacks made with this weapon receive +1 Accuracy.\n")
+    for n in range(20 * scale):
+        lines.append(f"Armor Piercing {n} (AP): Damage dealt by this weapon ignores Armor.\n")
+    lines += ["Loading: This weapon must be reloaded after each use.\n",
+              "Reliable X: This weapon always deals X damage, even if it misses.\n",
+              "X/Round: This can be used X times per round.\n",
+              "Personal Armor: This gear offers protection in combat.\n",
+              "Gear: This is a tool, piece of equipment, or other item.\n",
+              "Sidearm: This weapon can be used to Fight as a quick action.\n",
+              "\n"]
+    return lines
+
+
+def _pilot_gear(scale, size=1):
+    lines = ["Pilot Gear\n",
+             "On missions, pilots can take one set of armor and two weapons.\n",
+             "The names and descriptions given for pilot gear are generic.\n",
+             "\n",
+             "Archaic Melee\n",
+             "Melee, Archaic [Threat 1][1d3 kinetic damage]\n",
+             "Swords, knives and other blades.\n",
+             "\n"]
+    for n in range(4 * scale):
+        lines += [f"Signature Pistol {n}\n",
+                  f"Sidearm, Loading{_more_tags(size)} [Range 5][2 damage]\n",
+                  "A personalized weapon.\n",
+                  "\n",
+                  f"Heavy Rifle {n}\n",
+                  "Ranged [Range 10][3 explosive damage]\n",
+                  "A large rifle.\n",
+                  "\n"]
+    lines += ["Light Hardsuit\n",
+              "Personal Armor, Flight\n",
+              "[+3 HP][1 Armor][10 Evasion]\n",
+              "[10 E-Defense][4 Speed]\n",
+              "A flexible suit.\n",
+              "\n"]
+    for n in range(3 * scale):
+        lines += [f"Assault Hardsuit {n}\n",
+                  "Personal Armor\n",
+                  "[+3 HP][1 Armor][8 Evasion]\n",
+                  "[8 E-Defense][4 Speed]\n",
+                  "A rugged suit.\n",
+                  "\n"]
+    lines += ["Corrective\n",
+              "Gear, Limited 1\n",
+              "A tiny device that repairs tissue.\n",
+              "- It heals wounds.\n",
+              "\n"]
+    for n in range(6 * scale):
+        lines += [f"Patch {n}\n",
+                  f"Gear, Limited 3{_more_tags(size)}\n",
+                  "A medical patch.\n"]
+        lines += _more_lines(size, "Apply it to the wound")
+        lines += ["\n"]
+    lines += ["Wilderness Survival Kit\n",
+              "Gear\n",
+              "This kit contains many essentials for surviving in hostile environments: water, food.\n",
+              "\n"]
+    return lines
+
+
+def _skills(scale, size=1):
+    lines = ["ACT UNSEEN OR UNHEARD\n",
+             "Get somewhere or do something without being seen or heard.\n",
+             "APPLY FISTS TO FACES\n",
+             "Fight hand to hand.\n"]
+    for n in range(10 * scale):
+        lines += [f"ASSAULT {n}\n",
+                  "Take part in a direct attack.\n"]
+    lines += ["THREATEN\n",
+              "Use force or threats to make someone do what you want.\n",
+              "WORD ON THE STREET\n",
+              "Get gossip, news, or hearsay from the streets, bars and markets.\n",
+              "\n"]
+    return lines
+
+
+def _core_system(n, integrated=False, passive=False):
+    lines = ["CORE SYSTEM\n",
+             f"Core Engine {n}\n",
+             "This frame's core system is a marvel.\n"]
+    if passive:
+        lines += ["---\n",
+                  "Passive Field\n",
+                  "You gain +1 Evasion while this passive is online.\n"]
+    if integrated:
+        lines.append("Integrated Mount: Core Cannon\n")
+    lines += ["Overclock Protocol\n",
+              "Active (1CP), Protocol\n",
+              "For the rest of the scene, you gain +1 Accuracy on all attacks.\n",
+              "- You may Boost as a free action.\n"]
+    return lines
+
+
+def _frame(source, name, role, licensed, size=1):
+    lines = [source + "\n",
+             name + "\n",
+             role + "\n",
+             "This frame was built for long campaigns.\n",
+             "It is reliable, sturdy and cheap.\n"]
+    lines += _more_lines(size, "It has served in many wars")
+    lines += ["CORE STATS\n",
+              "Size: 1\n", "Armor: 1\n", "HP: 10\n", "Evasion: 8\n", "E-Defense: 8\n",
+              "Heat Cap: 6\n", "Repair Cap: 5\n", "Sensors: 10\n", "Tech Attack: -2\n",
+              "Save Target: 10\n", "Speed: 4\n", "System Points: 6\n",
+              "TRAITS\n",
+              "Guardian\n", "Adjacent allies can use this mech as hard cover.\n",
+              "Heavy Frame\n", "This mech can't be pushed by smaller characters.\n",
+              "MOUNTS\n",
+              "- Main Mount\n", "- Flexible Mount\n", "- Heavy Mount\n"]
+    lines += _core_system(name, integrated=licensed, passive=not licensed)
+    if licensed:
+        lines += [f"License I: {name.lower()} rifle, {name.lower()} netting, studded gauntlet\n",
+                  f"License II: {name} FRAME, {name.lower()} mod\n",
+                  f"License III: {name.lower()} cannon, {name.lower()} drone, {name.lower()} osiris\n"]
+    lines.append("\n")
+    return lines
+
+
+def _licensed_gear(name, source, size=1):
+    lines = [name + " RIFLE\n",
+             "Main Rifle, 1 SP, Loading, Reliable 2" + _more_tags(size) + "\n",
+             "[range 10][1d6+2 kinetic damage + 2 heat]\n",
+             "On hit: the target is Slowed.\n",
+             "---\n",
+             "A heavy rifle favored by " + source + " pilots.\n"]
+    lines += _more_lines(size, "It kicks like a mule")
+    lines += ["\n",
+              name + " CANNON\n",
+              "Heavy Cannon, Heat 2 (Self), 1/round\n",
+              "[range 5 or threat 3][blast 1][2d6 explosive or energy damage]\n",
+              "---\n",
+              "[A large gun.]\n",
+              "\n",
+              name + " MOD\n",
+              "2 SP, Mod, Unique\n",
+              "Melee, CQB, Rifle, Launcher, Cannon weapons: the weapon gains +1 damage.\n",
+              "---\n",
+              "A simple mod.\n",
+              "\n",
+              name + " NETTING\n",
+              "2 SP, Unique, Shield" + _more_tags(size) + "\n",
+              "Your mech gains Resistance to kinetic damage.\n",
+              "---\n",
+              "Synthetic muscle netting.\n"]
+    lines += _more_lines(size, "It flexes under load")
+    lines += ["\n",
+              name + " DRONE\n",
+              "2 SP, Drone, Quick Action\n",
+              "Expend a charge and deploy a Drone that can perform a tech action.\n",
+              "---\n",
+              "A small drone.\n",
+              "\n"]
+    return lines
+
+
+def _frames(scale, size=1):
+    lines = ["General Massive Systems\n",
+             "From Cradle to the stars, GMS:\n",
+             "assured quality, universal licensing, and total reliability.\n",
+             "General Massive Systems – GMS for short – is the galaxy's largest manufacturer.\n",
+             "It sells frames everywhere.\n",
+             "\n",
+             "CORE BONUSES\n",
+             "AUTO-STABILIZING HARDPOINTS\n",
+             "Your mech's systems are stabilized.\n",
+             "Your weapons gain +1 Accuracy.\n",
+             "OVERPOWER CALIBER\n",
+             "Your weapons hit harder.\n",
+             "1/round, deal +1d6 bonus damage.\n",
+             "\n"]
+    lines += _frame("GMS", "EVEREST", "Balanced pattern for general service", False)
+    lines += ["GMS Mech Weapons\n",
+              "GMS produces weapons in three tiers of quality.\n",
+              "Type-I (T-1) weapons are common kinetic arms.\n",
+              "Type-II (T-2) weapons are energy weapons. Charged blades are melee. "
+              "GMS's T-2 energy weapons, thermal guns, fire superheated beams.\n",
+              "Type-III (T-3) weapons are heavy ordnance.\n",
+              "\n"]
+    for n in range(scale):
+        lines += ["ASSAULT RIFLE\n",
+                  "Main Rifle, Reliable 2\n",
+                  "[range 10][1d6 kinetic damage]\n",
+                  "\n",
+                  "THERMAL RIFLE\n",
+                  "Main Rifle, Heat 1 (Self)\n",
+                  "[range 5]\n",
+                  "[2 energy damage]\n",
+                  "\n",
+                  "HOWITZER\n",
+                  "Heavy Cannon, Arcing, Ordnance, Loading\n",
+                  "[range 20][blast 2][2d6 explosive damage]\n",
+                  "\n"]
+    lines += ["GMS General Market Systems\n",
+              "\n"]
+    for n in range(3 * scale):
+        lines += [f"PATTERN-A SMOKE CHARGES {n}\n",
+                  "2 SP, Limited 3, Grenade, Mine\n",
+                  "Expend a charge to throw a (Grenade or (Mine of smoke.\n",
+                  "---\n",
+                  "Smoke charges.\n",
+                  "\n",
+                  f"CUSTOM PAINT JOB {n}\n",
+                  "1 SP, Unique\n",
+                  "When you take structure damage, roll 1d6. On a 6, you survive.\n",
+                  "\n"]
+    lines += ["GMS Flight Systems\n",
+              "These systems grant flight.\n",
+              "\n",
+              "JUMP JETS\n",
+              "2 SP, Unique\n",
+              "You can fly when you Boost or make a standard move.\n",
+              "\n",
+              "IPS-Northstar\n",
+              "[The best way to reach the stars.]\n",
+              "IPS-Northstar (IPS-N) was created through a merger.\n",
+              "It builds sturdy ships.\n",
+              "\n",
+              "CORE BONUSES\n",
+              "REINFORCED CABLING\n",
+              "Your mech's systems are hardened.\n",
+              "You gain +1 Armor.\n",
+              "\n"]
+    for n in range(6 * scale):
+        name = f"BLACKBEARD {n}"
+        lines += _frame("IPS-N", name, "Striker/Defender", True, size)
+        lines += _licensed_gear(name, "IPS-N", size)
+    lines += ["HORUS\n",
+              "[WE ARE NOT A COMPANY]\n",
+              "HORUS is an oddity among the various pan-galactic manufacturers.\n",
+              "\n"]
+    for n in range(2 * scale):
+        name = f"GOBLIN {n}"
+        lines += _frame("HORUS", name, "Support", True, size)
+        lines += _licensed_gear(name, "HORUS", size)
+        lines += [name + " OSIRIS\n",
+                  "2 SP, AI, Unique\n",
+                  "Your mech gains the AI tag and the following protocol:\n",
+                  "- Protocol, Unique\n",
+                  "- Quick Tech, 1/round\n",
+                  "---\n",
+                  "[An unshackled NHP.]\n",
+                  "\n"]
+    lines += ["STUDDED GAUNTLET\n",
+              "1 SP, Unique\n",
+              "Expend a charge and choose a character adjacent to you.\n",
+              "---\n",
+              "This studded gauntlet draws on a core reactor for power.\n",
+              "\n"]
+    return lines
+
+
+def _statuses(scale, size=1):
+    lines = ["STATUSES AND CONDITIONS\n",
+             "During combat, characters often inflict and receive statuses.\n",
+             "Actions, talents, systems, and other effects can all inflict statuses.\n",
+             "STATUSES\n"]
+    for n in range(3 * scale):
+        lines += [f"DANGER ZONE {n}\n",
+                  "Characters in the danger zone are hot.\n",
+                  "- They can't cool.\n"]
+    lines += ["CONDITIONS\n"]
+    for n in range(3 * scale):
+        lines += [f"IMMOBILIZED {n}\n",
+                  "Immobilized characters can't move.\n"]
+    lines += ["STUNNED\n",
+              "STUNNED mechs cannot OVERCHARGE, move, or take any actions.\n",
+              "STUNNED mechs have a maximum of 5 EVASION, and automatically fail saves.\n",
+              "\n"]
+    return lines
+
+
+def _glossary(scale, size=1):
+    lines = ["COMBAT TERMINOLOGY\n",
+             "ARMOR: All kinetic, energy, and explosive damage is reduced by armor.\n",
+             "BONUS DAMAGE: Extra damage – kinetic, energy or explosive.\n"]
+    for n in range(20 * scale):
+        lines.append(f"COVER {n}: Hard or soft obstructions between characters.\n")
+    lines += ["SPEED: The number of spaces a character can move.\n",
+              "TECH ATTACK: The statistic used to make tech attacks.\n",
+              "THREAT: The maximum range at which melee attacks can be made.\n",
+              "\n"]
+    return lines
+
+
+def _backgrounds(scale, size=1):
+    lines = ["Celebrity\n",
+             "Example triggers: Charm, Pull Rank, Lead or Inspire\n",
+             "You were a figure in the public eye. Who were you?\n",
+             "\n"]
+    for n in range(5 * scale):
+        lines += [f"Colonist {n}\n",
+                  "Example triggers: Word on the Street, Survive\n",
+                  "You were a colonist on a fringe world. What was it like?\n",
+                  "Your family: who were they?\n"]
+        lines += _more_lines(size, "The colony remembers you")
+        lines += ["\n"]
+    lines += ["Worker\n",
+              "Example triggers: Word on the Street, Get a Hold of Something\n",
+              "At the end of the day, empire only functions because of workers. What did you do?\n",
+              "\n"]
+    return lines
+
+
+def _actions(scale, size=1):
+    lines = ["DOWNTIME ACTIONS\n",
+             "Downtime actions represent specific activities undertaken by pilots.\n",
+             "Unlike skill checks, downtime actions have specific outcomes.\n"]
+    for n in range(3 * scale):
+        lines += [f"POWER AT A COST {n}\n",
+                  "You can get what you want, at a cost.\n",
+                  "- Roll 1d20.\n"]
+    lines += ["\n",
+              "QUICK ACTIONS\n",
+              "SKIRMISH\n",
+              "Attack with a single weapon.\n",
+              "BOOST\n",
+              "Move your speed.\n",
+              "SEARCH\n",
+              "Look for hidden characters.\n",
+              "\n",
+              "FULL ACTIONS\n",
+              "BARRAGE\n",
+              "Attack with two weapons.\n",
+              "DISENGAGE\n",
+              "Move ignoring engagement.\n",
+              "\n",
+              "OTHER ACTIONS\n",
+              "OVERCHARGE\n",
+              "Gain heat to take an extra action.\n",
+              "FREE ACTIONS\n",
+              "Free actions do not count toward your actions.\n",
+              "MOVE (MOVE)\n",
+              "Move your speed.\n",
+              "\n",
+              "REACTIONS\n",
+              "BRACE\n",
+              "Brace for impact.\n",
+              "OVERWATCH\n",
+              "Attack an enemy that moves into threat.\n",
+              "\n",
+              "PILOT ACTIONS\n",
+              "FIGHT (FULL ACTION)\n",
+              "Attack with a pilot weapon.\n",
+              "MOUNT, DISMOUNT, AND EJECT (FULL/QUICK ACTION)\n",
+              "You can climb into or out of a mech.\n",
+              "You can also EJECT as a quick action.\n",
+              "On each of your subsequent turns, you can continue to choose this.\n",
+              "RELOAD (QUICK ACTION)\n",
+              "When you RELOAD, you reload one Pilot Weapon with the LOADING tag.\n",
+              "\n"]
+    return lines
+
+
+def _reserves(scale, size=1):
+    lines = ["RESOURCES\n",
+             "1-2 Access\n",
+             "A keycard, invite, bribes or insider information.\n"]
+    for n in range(3 * scale):
+        lines += [f"{2 * n + 3}-{2 * n + 4} Backing\n",
+                  "Money, or a wealthy backer.\n"]
+    lines += ["TACTICAL RESERVES\n",
+              "17-18 Deployable Shield\n",
+              "The ability to start the mission by dropping a shield.\n",
+              "19-20 NHP Assistant \n",
+              "A non-human person (NHP) – an advanced AI.\n",
+              "\n"]
+    return lines
+
+
+def _npc_class(name, role):
+    lines = [name + "\n",
+             role + "\n"]
+    if name == "Ace":
+        lines.append("The first person to embody the “Ace” archetype was Aisling.\n")
+    else:
+        lines.append(f"The {name} is a common sight on the battlefield.\n")
+    lines += ["Tactics\n",
+              "Strike hard and fast.\n",
+              "Stats\n"]
+    for tier in range(3):
+        lines += [f"Tier {tier + 1}\n",
+                  f"Armor: {tier}\n", f"HP: {10 + 2 * tier}\n", f"Evasion: {8 + tier}\n",
+                  "E-Defense: 8\n", "Heat Cap: 8\n", "Speed: 4\n", "Sensors: 10\n",
+                  "Save Target: 11\n", "Hull: +1\n", "Agility: +2\n", "Systems: –1\n",
+                  "Engineering: 0\n", "Size: 1 or 2\n", "Activations: 1\n"]
+    lines.append("\n")
+    return lines
+
+
+def _npc_features(name, n, size=1):
+    lines = ["Base Systems\n",
+             "\n",
+             f"{name} Cannon {n}\n",
+             "Main Rifle, +1/+2/+3, Accuracy 1, Reliable 2" + _more_tags(size) + "\n",
+             "[Range 10][4/6/8 kinetic damage]\n",
+             "On hit: the target is Slowed.\n",
+             "\n",
+             f"{name} Armor {n}\n",
+             "Trait\n",
+             "The NPC gains +1 armor and +2 hp.\n"]
+    lines += _more_lines(size, "Its plating is thick")
+    lines += ["\n",
+              "Optional Systems\n",
+              "\n",
+              f"{name} Hack {n}\n",
+              "Quick Tech, +1/+2/+3, Recharge 5+\n",
+              "The NPC makes a tech attack for 2/3/4 heat.\n",
+              "\n",
+              f"{name} Dodge {n}\n",
+              "Reaction, 1/round\n",
+              "Trigger: The NPC is hit.\n",
+              "The attack misses.\n",
+              "\n",
+              f"{name} Shield {n}\n",
+              "System, Limited 2\n",
+              "Gain +5 hp.\n",
+              "\n"]
+    return lines
+
+
+def _npcs(scale, size=1):
+    lines = _npc_class("Ace", "Striker")
+    lines += _npc_features("Ace", 0)
+    for n in range(8 * scale):
+        lines += _npc_class(f"Assault {n}", "Controller")
+        lines += _npc_features("Assault", n, size)
+    lines += _npc_class("Monstrosity", "Biological")
+    lines += ["Base Systems\n",
+              "\n",
+              "Winged\n",
+              "Trait\n",
+              "The Monstrosity may fly whenever it moves, but must end on the ground.\n",
+              "\n",
+              "Commander\n",
+              "Commanders operate on a grand scale, controlling forces.\n",
+              "Template Features\n",
+              "\n",
+              "Command Tactics\n",
+              "Template Feature\n",
+              "Allies gain +1 Accuracy.\n",
+              "\n"]
+    for n in range(2 * scale):
+        lines += [f"Elite {n}\n",
+                  "Elites are dangerous opponents.\n",
+                  "Template Features\n",
+                  "\n",
+                  f"Elite Resilience {n}\n",
+                  "Template Feature\n",
+                  "The NPC gains +1 structure.\n",
+                  "\n"]
+    lines += ["Vehicle\n",
+              "Vehicles are not mechs.\n",
+              "Template Features\n",
+              "\n",
+              "Treads or Hover\n",
+              "Trait\n",
+              "The Vehicle ignores difficult terrain.\n",
+              "\n"]
+    return lines
+
+
+SECTIONS = [_talents, _tags, _pilot_gear, _skills, _frames, _statuses, _glossary,
+            _backgrounds, _actions, _reserves, _npcs]
+
+
+def generate(scale=1, entry_size=1):
+    """
+    Generate a synthetic rulebook.
+    @param scale: int: Multiplier for the number of entries in each section.
+    @param entry_size: int: Multiplier for the length of entries: the number
+    of description lines, and of tags on tag lines, of talents, pilot gear,
+    frames, licensed gear, backgrounds and NPC features.
+    @return: [str]: The rulebook, one entry per line including the newline.
+    """
+    lines = ["LANCER SYNTHETIC RULEBOOK\n", "\n"]
+    for section in SECTIONS:
+        lines += section(scale, entry_size)
+        lines += ["Filler text between sections.\n", "\n"]
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-x", "--scale", type=int, default=1,
+                        help="Multiplier for the number of entries in each section.")
+    parser.add_argument("-e", "--entry-size", type=int, default=1,
+                        help="Multiplier for the length of each entry's description and tags.")
+    parser.add_argument("out", help="output file for the synthetic rulebook")
+    args = parser.parse_args()
+
+    with open(args.out, 'w', encoding='utf-8') as outFile:
+        outFile.writelines(generate(args.scale, args.entry_size))
@@ -2,11 +2,15 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Tag:
+class Tag(Record):
     """Class for tag data"""
 
+    __slots__ = ("id", "name", "description", "filter_ignore")
+    FIELDS = ["id", "name", "description", "filter_ignore"]
+
     START = ["Harm type\n",
              "Weapons deal one of four types of damage – ",
              "Burn X: On a hit, this weapon deals X"]
@@ -75,9 +79,3 @@ class Tag:
 
     def set_filter(self, new_filter):
         self.filter_ignore = new_filter
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "description": self.description,
-                "filter_ignore": self.filter_ignore}
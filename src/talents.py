@@ -2,9 +2,10 @@
 # -*- utf-8 -*-
 
 from parseutil import *
+from serializers import Record
 
 
-class Talent:
+class Talent(Record):
     """
     Class for talent data
     NECESSARY PREP-WORK:
@@ -13,6 +14,9 @@ class Talent:
     * Grease Monkey: Rank 3 is numbered 2.
     """
 
+    __slots__ = ("id", "name", "description", "ranks")
+    FIELDS = ["id", "name", "description", "ranks"]
+
     START = ["Ace\n",
              "Every pilot brags about their abilities;",
              "Whether you’re a talented rookie or a grizzled "]
@@ -97,9 +101,3 @@ class Talent:
     def set_rank(self, idx, rank_name, rank_desc):
         self.ranks[idx]["name"] = rank_name
         self.ranks[idx]["description"] = rank_desc
-
-    def to_dict(self):
-        return {"id": self.id,
-                "name": self.name,
-                "description": self.description,
-                "ranks": self.ranks}
\ No newline at end of file
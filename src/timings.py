@@ -0,0 +1,180 @@
+#!/bin/python3
+# -*- utf-8 -*-
+
+import json
+import os
+import time
+
+
+class Phase:
+    """
+    A timed phase of a section (e.g. "split", "parse", "write"). Used as a
+    context manager around the code for the phase. It can be entered more than
+    once, e.g. for each hunk, and the time spent inside is added up. Counts of
+    the records and bytes the phase handled can be set on it as well.
+    """
+
+    def __init__(self, section, name):
+        """
+        @param section: str: The section the phase belongs to.
+        @param name: str: The phase.
+        """
+        self.section = section
+        self.name = name
+        self.pid = os.getpid()
+        self.records = None
+        self.bytes = None
+        self.total_ns = 0
+        # (start, duration) in ns of each time the phase was entered.
+        self.intervals = []
+        self._entered = 0
+
+    def __enter__(self):
+        self._entered = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter_ns() - self._entered
+        self.total_ns += duration
+        self.intervals.append((self._entered, duration))
+
+    def to_dict(self):
+        """
+        @return: dict: Summary of the phase.
+        """
+        d = dict([
+            ("section", self.section),
+            ("phase", self.name),
+            ("ns", self.total_ns),
+            ("calls", len(self.intervals))
+        ])
+        if self.records is not None:
+            d["records"] = self.records
+        if self.bytes is not None:
+            d["bytes"] = self.bytes
+        return d
+
+
+class Timings:
+    """
+    Collects the phases timed during a run, and reports them as JSON or as a
+    Chrome trace (viewable in chrome://tracing or Perfetto). Phases are only
+    kept while enabled, so timing costs nothing but a few clock reads
+    otherwise.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = []
+
+    def phase(self, section, name):
+        """
+        Start recording a phase.
+        @param section: str: The section the phase belongs to.
+        @param name: str: The phase.
+        @return: Phase: The phase, to be used as a context manager.
+        """
+        p = Phase(section, name)
+        if self.enabled:
+            self.phases.append(p)
+        return p
+
+    def clear(self):
+        """
+        Forget all recorded phases.
+        @return: None.
+        """
+        self.phases = []
+
+    def extend(self, phases):
+        """
+        Add phases recorded elsewhere, e.g. in a worker process.
+        @param phases: [Phase]: The phases to add.
+        @return: None.
+        """
+        if self.enabled:
+            self.phases.extend(phases)
+
+    def report(self):
+        """
+        Summarize the recorded phases.
+        @return: dict: "phases" is a list of every phase's summary, in the
+        order they were recorded, and "sections" maps section -> phase ->
+        the phase's total ns, calls, records, and bytes.
+        """
+        sections = dict()
+        for p in self.phases:
+            d = p.to_dict()
+            totals = sections.setdefault(p.section, dict()).setdefault(
+                p.name, dict([("ns", 0), ("calls", 0)]))
+            totals["ns"] += d["ns"]
+            totals["calls"] += d["calls"]
+            for key in ("records", "bytes"):
+                if key in d:
+                    totals[key] = totals.get(key, 0) + d[key]
+        return {"phases": [p.to_dict() for p in self.phases],
+                "sections": sections}
+
+    def trace_events(self):
+        """
+        Convert the recorded phases to Chrome trace events. Each time a phase
+        was entered becomes one complete ("X") event, with sections shown as
+        threads of the process that parsed them.
+        @return: [dict]: The trace events.
+        """
+        events = []
+        # Trace viewers want numeric thread ids, so number the sections and
+        #   name the threads after them.
+        tids = dict()
+        for p in self.phases:
+            if (p.pid, p.section) not in tids:
+                tids[(p.pid, p.section)] = len(tids) + 1
+                events.append({"name": "thread_name",
+                               "ph": "M",
+                               "pid": p.pid,
+                               "tid": tids[(p.pid, p.section)],
+                               "args": {"name": p.section}})
+            args = dict()
+            if p.records is not None:
+                args["records"] = p.records
+            if p.bytes is not None:
+                args["bytes"] = p.bytes
+            for start, duration in p.intervals:
+                events.append({"name": p.name,
+                               "cat": p.section,
+                               "ph": "X",
+                               "ts": start / 1000,
+                               "dur": duration / 1000,
+                               "pid": p.pid,
+                               "tid": tids[(p.pid, p.section)],
+                               "args": args})
+        return events
+
+    def write_json(self, file_name):
+        """
+        Write the timing report.
+        @param file_name: str: The file to write.
+        @return: None.
+        """
+        self._write(file_name, self.report())
+
+    def write_trace(self, file_name):
+        """
+        Write the phases as a Chrome trace.
+        @param file_name: str: The file to write.
+        @return: None.
+        """
+        self._write(file_name, {"traceEvents": self.trace_events(),
+                                "displayTimeUnit": "ms"})
+
+    @staticmethod
+    def _write(file_name, data):
+        try:
+            with open(file_name, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"Error ({e}) writing timings file {file_name}")
+
+
+# Timings for the current process.
+TIMINGS = Timings()